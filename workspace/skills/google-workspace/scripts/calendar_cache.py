@@ -0,0 +1,173 @@
+"""Local SQLite store of calendar events, plus an in-memory interval index.
+
+Holds each calendar's events (as returned by events.list with
+singleEvents=True) and its nextSyncToken, so gcalendar.py can follow
+incremental deltas instead of re-listing events on every run. Queries
+load a calendar into an IntervalIndex for fast time-window lookups.
+Used by gcalendar.py via: from calendar_cache import EventCache, IntervalIndex
+"""
+
+import bisect
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from google_auth import CACHE_DIR
+
+CALENDAR_CACHE_DB = CACHE_DIR / "calendar.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    synced_at REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def event_bounds_ms(event: dict, tz) -> tuple:
+    """(start, end) of an event in epoch milliseconds; all-day dates use tz midnight."""
+    bounds = []
+    for key in ("start", "end"):
+        value = event.get(key, {})
+        if "dateTime" in value:
+            moment = datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))
+        else:
+            moment = datetime.fromisoformat(value["date"]).replace(tzinfo=tz)
+        bounds.append(int(moment.timestamp() * 1000))
+    return tuple(bounds)
+
+
+class IntervalIndex:
+    """Events sorted by start, answering "what overlaps [t0, t1)" queries.
+
+    Overlap needs start < t1 and end > t0. Starts are sorted, and no event
+    is longer than max_length, so only events starting in
+    (t0 - max_length, t1) are candidates: two bisects plus a scan of that
+    slice.
+    """
+
+    def __init__(self, rows: list):
+        rows = sorted(rows, key=lambda r: r[0])
+        self.starts = [r[0] for r in rows]
+        self.rows = rows
+        self.max_length = max((r[1] - r[0] for r in rows), default=0)
+
+    def overlapping(self, t0: int, t1: int) -> list:
+        lo = bisect.bisect_right(self.starts, t0 - self.max_length)
+        hi = bisect.bisect_left(self.starts, t1)
+        return [event for start, end, event in self.rows[lo:hi] if end > t0]
+
+
+class EventCache:
+    """SQLite-backed calendar event cache."""
+
+    def __init__(self, path=CALENDAR_CACHE_DB):
+        path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        os.chmod(path, 0o600)
+
+    def close(self):
+        self.conn.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- sync state --
+
+    def sync_token(self, calendar_id: str) -> str | None:
+        row = self.conn.execute(
+            "SELECT sync_token FROM sync_state WHERE calendar_id = ?", (calendar_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def age(self, calendar_id: str) -> float | None:
+        """Seconds since the calendar was last synced, or None if never synced."""
+        row = self.conn.execute(
+            "SELECT synced_at FROM sync_state WHERE calendar_id = ? AND sync_token IS NOT NULL",
+            (calendar_id,),
+        ).fetchone()
+        return time.time() - row[0] if row else None
+
+    def mark_synced(self, calendar_id: str, sync_token: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sync_state (calendar_id, sync_token, synced_at) VALUES (?, ?, ?)",
+            (calendar_id, sync_token, time.time()),
+        )
+        self.conn.commit()
+
+    def calendar_list(self, max_age: float) -> list | None:
+        """The cached calendarList entries, or None if missing or older than max_age."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'calendar_list'").fetchone()
+        if not row:
+            return None
+        cached = json.loads(row[0])
+        if time.time() - cached["synced_at"] > max_age:
+            return None
+        return cached["items"]
+
+    def set_calendar_list(self, calendars: list) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('calendar_list', ?)",
+            (json.dumps({"items": calendars, "synced_at": time.time()}),),
+        )
+        self.conn.commit()
+
+    # -- writes --
+
+    def clear(self, calendar_id: str) -> None:
+        self.conn.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+        self.conn.execute("DELETE FROM sync_state WHERE calendar_id = ?", (calendar_id,))
+
+    def upsert(self, calendar_id: str, events: list, tz) -> None:
+        rows = []
+        for event in events:
+            start_ms, end_ms = event_bounds_ms(event, tz)
+            rows.append((calendar_id, event["id"], start_ms, end_ms, json.dumps(event)))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO events (calendar_id, id, start_ms, end_ms, data)"
+            " VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def delete(self, calendar_id: str, event_ids: list) -> None:
+        self.conn.executemany(
+            "DELETE FROM events WHERE calendar_id = ? AND id = ?",
+            [(calendar_id, i) for i in event_ids],
+        )
+
+    def prune(self, before_ms: int) -> None:
+        """Drop events that ended before before_ms."""
+        self.conn.execute("DELETE FROM events WHERE end_ms < ?", (before_ms,))
+
+    # -- reads --
+
+    def index(self, calendar_id: str) -> IntervalIndex:
+        return IntervalIndex([
+            (start_ms, end_ms, json.loads(data))
+            for start_ms, end_ms, data in self.conn.execute(
+                "SELECT start_ms, end_ms, data FROM events WHERE calendar_id = ?", (calendar_id,)
+            )
+        ])
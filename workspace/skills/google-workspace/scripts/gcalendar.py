@@ -8,14 +8,26 @@ Commands:
     today    - List today's events
     upcoming - List events in the next N days
     search   - Search events by text
+    find_slots - Find free time shared by you and other attendees
     create   - Create a calendar event
+
+today, upcoming and search take "calendars": "all" (or a list of calendar
+ids/names) to query several calendars at once; GOOGLE_CALENDARS in
+~/.openclaw/.env sets the default. "cache": true answers them from the
+local event cache (calendar_cache.py), refreshed via syncToken deltas.
 """
 
+import heapq
 import json
+import os
 import sys
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dtime, timedelta
 
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 try:
     from zoneinfo import ZoneInfo
@@ -24,10 +36,31 @@ except ImportError:
 
 # Allow importing google_auth from same directory
 sys.path.insert(0, sys.path[0])
-from google_auth import get_credentials
+from google_auth import authorized_http, get_credentials, refresh_credentials
+from google_executor import execute
+from calendar_cache import EventCache
 
 TIMEZONE = "America/Chicago"
 
+# Calendars queried in parallel when "calendars" selects several
+CALENDAR_WORKERS = 8
+
+# Local event cache ("cache": true): how far back a full sync reaches, and
+# how old (seconds) a calendar's last sync may be before a delta refresh
+CACHE_PAST_DAYS = 30
+DEFAULT_CACHE_MAX_AGE = 300
+
+# find_slots defaults: working hours (in TIMEZONE), meeting length and the
+# gap kept around existing meetings, in minutes. Window starts are rounded
+# up to SLOT_ROUND_MINUTES.
+WORK_START = "09:00"
+WORK_END = "17:00"
+DEFAULT_SLOT_MINUTES = 30
+DEFAULT_BUFFER_MINUTES = 0
+SLOT_ROUND_MINUTES = 15
+# Google answers freebusy for at most 50 calendars per query
+FREEBUSY_MAX_CALENDARS = 50
+
 
 def get_service():
     creds = get_credentials()
@@ -55,6 +88,238 @@ def format_event(event: dict) -> dict:
     }
 
 
+_thread_local = threading.local()
+
+
+def _thread_service():
+    # httplib2 connections aren't thread-safe, so each worker gets its own
+    # connection, sharing the credentials fetch_events already refreshed
+    if not hasattr(_thread_local, "service"):
+        _thread_local.service = build("calendar", "v3", http=authorized_http(get_credentials()))
+    return _thread_local.service
+
+
+def list_calendars(service) -> list:
+    """Every entry in the user's calendar list (following pages)."""
+    calendars = []
+    page_token = None
+    while True:
+        results = execute(service.calendarList().list(pageToken=page_token))
+        calendars.extend(results.get("items", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+    return calendars
+
+
+def resolve_calendars(service, selection, max_age: float | None = None) -> list:
+    """Turn "all", a list of ids/names, or a single id into calendar ids.
+
+    With max_age, the calendar list comes from the local event cache when
+    it was fetched less than max_age seconds ago.
+    """
+    if selection in (None, "", "primary"):
+        return ["primary"]
+
+    if max_age is None:
+        calendars = list_calendars(service)
+    else:
+        with EventCache() as cache:
+            calendars = cache.calendar_list(max_age)
+            if calendars is None:
+                calendars = [
+                    {"id": c["id"], "summary": c.get("summary", ""), "deleted": c.get("deleted", False)}
+                    for c in list_calendars(service)
+                ]
+                cache.set_calendar_list(calendars)
+
+    if selection == "all":
+        return [c["id"] for c in calendars if not c.get("deleted")]
+
+    wanted = [selection] if isinstance(selection, str) else selection
+    by_name = {c.get("summary", "").lower(): c["id"] for c in calendars}
+    ids = []
+    for name in wanted:
+        if name == "primary" or any(c["id"] == name for c in calendars):
+            ids.append(name)
+        elif name.lower() in by_name:
+            ids.append(by_name[name.lower()])
+        else:
+            raise ValueError(f"Unknown calendar: {name}")
+    return ids
+
+
+def selected_calendars(service, args: dict) -> list:
+    """Calendar ids for args["calendars"], defaulting to GOOGLE_CALENDARS or primary.
+
+    With args["cache"], the calendar list is reused for up to max_age seconds.
+    """
+    # get_service() loaded ~/.openclaw/.env, which may set GOOGLE_CALENDARS
+    selection = args.get("calendars", os.environ.get("GOOGLE_CALENDARS", "primary"))
+    if isinstance(selection, str) and "," in selection:
+        selection = [c.strip() for c in selection.split(",")]
+    max_age = args.get("max_age", DEFAULT_CACHE_MAX_AGE) if args.get("cache") else None
+    return resolve_calendars(service, selection, max_age)
+
+
+def list_events(calendar_id: str, **params) -> list:
+    """All events on one calendar (following pages), sorted by start time."""
+    service = _thread_service()
+    events = []
+    page_token = None
+    while True:
+        results = execute(service.events().list(
+            calendarId=calendar_id,
+            singleEvents=True,
+            orderBy="startTime",
+            timeZone=TIMEZONE,
+            pageToken=page_token,
+            **params,
+        ))
+        for event in results.get("items", []):
+            event["_calendar"] = calendar_id
+            events.append(event)
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+    return events
+
+
+def sync_calendar(cache: EventCache, calendar_id: str):
+    """Bring one calendar's cached events up to date.
+
+    Follows the stored syncToken when there is one; otherwise (or after a
+    410 Gone, when Google has expired the token) does a full sync from
+    CACHE_PAST_DAYS ago, replacing the calendar's cached events. All pages
+    are fetched before anything is written, so the SQLite write lock is
+    held only for one short transaction and parallel syncs don't serialize
+    on the network.
+    """
+    service = _thread_service()
+    tz = ZoneInfo(TIMEZONE)
+    sync_token = cache.sync_token(calendar_id)
+
+    items = []
+    page_token = None
+    while True:
+        params = {"calendarId": calendar_id, "singleEvents": True, "timeZone": TIMEZONE,
+                  "maxResults": 2500, "pageToken": page_token}
+        if sync_token:
+            params["syncToken"] = sync_token
+        else:
+            params["timeMin"] = (datetime.now(tz) - timedelta(days=CACHE_PAST_DAYS)).isoformat()
+
+        try:
+            results = execute(service.events().list(**params))
+        except HttpError as e:
+            if e.resp.status == 410 and sync_token:
+                sync_token = None
+                items = []
+                page_token = None
+                continue
+            raise
+
+        items.extend(results.get("items", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+
+    if not sync_token:
+        cache.clear(calendar_id)
+    cache.delete(calendar_id, [e["id"] for e in items if e.get("status") == "cancelled"])
+    cache.upsert(calendar_id, [e for e in items if e.get("status") != "cancelled"], tz)
+    cache.prune(int((time.time() - CACHE_PAST_DAYS * 86400) * 1000))
+    cache.mark_synced(calendar_id, results["nextSyncToken"])
+
+
+def cached_events(calendar_id: str, max_age: float, timeMin: str, timeMax: str, q: str = "") -> list:
+    """Events overlapping [timeMin, timeMax) from the local cache, sorted by start.
+
+    Syncs the calendar first when its last sync is older than max_age
+    seconds. q matches case-insensitively against summary, description,
+    location and attendee emails.
+    """
+    with EventCache() as cache:
+        age = cache.age(calendar_id)
+        if age is None or age > max_age:
+            sync_calendar(cache, calendar_id)
+        index = cache.index(calendar_id)
+
+    t0 = int(datetime.fromisoformat(timeMin).timestamp() * 1000)
+    t1 = int(datetime.fromisoformat(timeMax).timestamp() * 1000)
+    events = index.overlapping(t0, t1)
+    if q:
+        needle = q.lower()
+        events = [e for e in events if needle in event_text(e)]
+    for event in events:
+        event["_calendar"] = calendar_id
+    return events
+
+
+def event_text(event: dict) -> str:
+    fields = [event.get("summary", ""), event.get("description", ""), event.get("location", "")]
+    for attendee in event.get("attendees", []):
+        fields += [attendee.get("email", ""), attendee.get("displayName", "")]
+    return " ".join(fields).lower()
+
+
+def event_start(event: dict) -> datetime:
+    """Start time as an aware datetime; all-day events start at local midnight."""
+    start = event.get("start", {})
+    if "dateTime" in start:
+        return datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00"))
+    return datetime.fromisoformat(start["date"]).replace(tzinfo=ZoneInfo(TIMEZONE))
+
+
+def fetch_events(args: dict, **params) -> tuple:
+    """Query the selected calendars concurrently and merge by start time.
+
+    args["calendars"] is "all", a list of calendar ids/names, or omitted for
+    GOOGLE_CALENDARS (default "primary"). Each calendar's events arrive
+    sorted, so they are k-way merged on a heap; an event on several
+    calendars (same iCalUID and start) is kept once. With args["cache"],
+    events come from the local cache (see cached_events). Returns
+    (events, calendar_ids).
+    """
+    service = get_service()
+    calendar_ids = selected_calendars(service, args)
+
+    if args.get("cache"):
+        max_age = args.get("max_age", DEFAULT_CACHE_MAX_AGE)
+        fetch = lambda c: cached_events(c, max_age, **params)  # noqa: E731
+    else:
+        fetch = lambda c: list_events(c, **params)  # noqa: E731
+
+    if len(calendar_ids) == 1:
+        _thread_local.service = service
+        streams = [fetch(calendar_ids[0])]
+    else:
+        refresh_credentials(get_credentials())
+        with ThreadPoolExecutor(max_workers=min(CALENDAR_WORKERS, len(calendar_ids))) as pool:
+            streams = list(pool.map(fetch, calendar_ids))
+
+    events = []
+    seen = set()
+    for event in heapq.merge(*streams, key=event_start):
+        key = (event.get("iCalUID") or event.get("id"), event_start(event))
+        if key in seen:
+            continue
+        seen.add(key)
+        events.append(event)
+    return events, calendar_ids
+
+
+def format_events(events: list, calendar_ids: list) -> list:
+    """format_event() each event, tagging its calendar when several were queried."""
+    output = []
+    for event in events:
+        formatted = format_event(event)
+        if calendar_ids != ["primary"]:
+            formatted["calendar"] = event["_calendar"]
+        output.append(formatted)
+    return output
+
+
 def cmd_today(args: dict):
     """List today's events."""
     tz = ZoneInfo(TIMEZONE)
@@ -62,18 +327,10 @@ def cmd_today(args: dict):
     start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
     end_of_day = start_of_day + timedelta(days=1)
 
-    service = get_service()
-    results = service.events().list(
-        calendarId="primary",
-        timeMin=start_of_day.isoformat(),
-        timeMax=end_of_day.isoformat(),
-        singleEvents=True,
-        orderBy="startTime",
-        timeZone=TIMEZONE,
-    ).execute()
-
-    events = results.get("items", [])
-    output = [format_event(e) for e in events]
+    events, calendar_ids = fetch_events(
+        args, timeMin=start_of_day.isoformat(), timeMax=end_of_day.isoformat()
+    )
+    output = format_events(events, calendar_ids)
 
     print(json.dumps({
         "date": now.strftime("%Y-%m-%d"),
@@ -90,18 +347,8 @@ def cmd_upcoming(args: dict):
     now = datetime.now(tz)
     end_date = now + timedelta(days=days)
 
-    service = get_service()
-    results = service.events().list(
-        calendarId="primary",
-        timeMin=now.isoformat(),
-        timeMax=end_date.isoformat(),
-        singleEvents=True,
-        orderBy="startTime",
-        timeZone=TIMEZONE,
-    ).execute()
-
-    events = results.get("items", [])
-    output = [format_event(e) for e in events]
+    events, calendar_ids = fetch_events(args, timeMin=now.isoformat(), timeMax=end_date.isoformat())
+    output = format_events(events, calendar_ids)
 
     print(json.dumps({
         "from": now.strftime("%Y-%m-%d"),
@@ -125,19 +372,10 @@ def cmd_search(args: dict):
     now = datetime.now(tz)
     end_date = now + timedelta(days=days)
 
-    service = get_service()
-    results = service.events().list(
-        calendarId="primary",
-        q=query,
-        timeMin=now.isoformat(),
-        timeMax=end_date.isoformat(),
-        singleEvents=True,
-        orderBy="startTime",
-        timeZone=TIMEZONE,
-    ).execute()
-
-    events = results.get("items", [])
-    output = [format_event(e) for e in events]
+    events, calendar_ids = fetch_events(
+        args, q=query, timeMin=now.isoformat(), timeMax=end_date.isoformat()
+    )
+    output = format_events(events, calendar_ids)
 
     print(json.dumps({
         "query": query,
@@ -146,6 +384,168 @@ def cmd_search(args: dict):
     }))
 
 
+def parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def merge_busy(intervals: list, buffer: timedelta) -> list:
+    """Union of (start, end) busy intervals, each padded by buffer, via a sweep line.
+
+    Starts and ends become +1/-1 points; walking them in time order, a busy
+    block opens when the depth leaves 0 and closes when it returns to 0.
+    Ends sort before starts at the same instant, so back-to-back meetings
+    stay separate blocks (the gap between them is empty either way).
+    """
+    points = []
+    for start, end in intervals:
+        points.append((start - buffer, 1))
+        points.append((end + buffer, -1))
+    points.sort(key=lambda p: (p[0], p[1]))
+
+    merged = []
+    depth = 0
+    for moment, delta in points:
+        if delta == 1 and depth == 0:
+            block_start = moment
+        depth += delta
+        if depth == 0:
+            merged.append((block_start, moment))
+    return merged
+
+
+def working_windows(start: datetime, end: datetime, work_start: dtime, work_end: dtime,
+                    weekends: bool) -> list:
+    """Working-hours windows (in TIMEZONE) between start and end, one per day."""
+    tz = ZoneInfo(TIMEZONE)
+    windows = []
+    day = start.astimezone(tz).date()
+    while True:
+        day_start = datetime.combine(day, work_start, tzinfo=tz)
+        if day_start >= end:
+            break
+        if weekends or day.weekday() < 5:
+            lo = max(day_start, start)
+            hi = min(datetime.combine(day, work_end, tzinfo=tz), end)
+            if lo < hi:
+                windows.append((lo, hi))
+        day += timedelta(days=1)
+    return windows
+
+
+def round_up(moment: datetime, minutes: int) -> datetime:
+    step = timedelta(minutes=minutes)
+    floor = moment.replace(second=0, microsecond=0)
+    floor -= timedelta(minutes=floor.minute % minutes)
+    return floor if floor == moment else floor + step
+
+
+def free_windows(windows: list, busy: list, duration: timedelta) -> list:
+    """Subtract merged busy blocks from working windows; keep gaps >= duration.
+
+    Both lists are sorted and non-overlapping, so one pass with a pointer
+    into busy covers every window.
+    """
+    free = []
+    i = 0
+    for lo, hi in windows:
+        while i < len(busy) and busy[i][1] <= lo:
+            i += 1
+        cursor = lo
+        j = i
+        while j < len(busy) and busy[j][0] < hi:
+            if busy[j][0] > cursor:
+                free.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if cursor < hi:
+            free.append((cursor, hi))
+
+    result = []
+    for start, end in free:
+        start = round_up(start, SLOT_ROUND_MINUTES)
+        if end - start >= duration:
+            result.append((start, end))
+    return result
+
+
+def cmd_find_slots(args: dict):
+    """Find free windows shared by the selected calendars and attendees."""
+    attendees = args.get("attendees", [])
+    duration = timedelta(minutes=args.get("duration", DEFAULT_SLOT_MINUTES))
+    buffer = timedelta(minutes=args.get("buffer", DEFAULT_BUFFER_MINUTES))
+    work_start = dtime.fromisoformat(args.get("work_start", WORK_START))
+    work_end = dtime.fromisoformat(args.get("work_end", WORK_END))
+    rank = args.get("rank", "soonest")
+
+    if rank not in ("soonest", "longest"):
+        print(json.dumps({"error": "'rank' must be \"soonest\" or \"longest\"", "type": "invalid_args"}))
+        return
+    if work_start >= work_end:
+        print(json.dumps({"error": "'work_start' must be before 'work_end'", "type": "invalid_args"}))
+        return
+
+    tz = ZoneInfo(TIMEZONE)
+    now = datetime.now(tz)
+    start = parse_time(args["start"]) if args.get("start") else now
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=tz)
+    start = max(start, now)
+    end = start + timedelta(days=args.get("days", 5))
+
+    service = get_service()
+    calendar_ids = selected_calendars(service, args)
+    calendar_ids += [a for a in attendees if a not in calendar_ids]
+    if len(calendar_ids) > FREEBUSY_MAX_CALENDARS:
+        print(json.dumps({
+            "error": f"At most {FREEBUSY_MAX_CALENDARS} calendars and attendees per query",
+            "type": "invalid_args",
+        }))
+        return
+
+    result = execute(service.freebusy().query(body={
+        "timeMin": start.isoformat(),
+        "timeMax": end.isoformat(),
+        "timeZone": TIMEZONE,
+        "items": [{"id": c} for c in calendar_ids],
+    }))
+
+    intervals = []
+    unavailable = []
+    for calendar_id, info in result.get("calendars", {}).items():
+        if info.get("errors"):
+            # e.g. notFound for attendees outside the domain who don't share free/busy
+            unavailable.append({
+                "calendar": calendar_id,
+                "reason": ", ".join(e.get("reason", "") for e in info["errors"]),
+            })
+            continue
+        intervals.extend((parse_time(b["start"]), parse_time(b["end"])) for b in info.get("busy", []))
+
+    busy = merge_busy(intervals, buffer)
+    windows = working_windows(start, end, work_start, work_end, args.get("weekends", False))
+    slots = free_windows(windows, busy, duration)
+    if rank == "longest":
+        slots.sort(key=lambda w: w[0] - w[1])
+    slots = slots[:args.get("max", 10)]
+
+    output = [{
+        "start": lo.astimezone(tz).isoformat(),
+        "end": hi.astimezone(tz).isoformat(),
+        "minutes": int((hi - lo).total_seconds() // 60),
+    } for lo, hi in slots]
+
+    print(json.dumps({
+        "from": start.strftime("%Y-%m-%d"),
+        "to": end.strftime("%Y-%m-%d"),
+        "timezone": TIMEZONE,
+        "calendars": calendar_ids,
+        "duration": int(duration.total_seconds() // 60),
+        "slots": output,
+        "count": len(output),
+        "unavailable": unavailable,
+    }))
+
+
 def cmd_create(args: dict):
     """Create a calendar event."""
     summary = args.get("summary", "")
@@ -183,9 +583,9 @@ def cmd_create(args: dict):
         event_body["attendees"] = [{"email": e} for e in args["attendees"]]
 
     service = get_service()
-    result = service.events().insert(
+    result = execute(service.events().insert(
         calendarId="primary", body=event_body
-    ).execute()
+    ), idempotent=False)
 
     print(json.dumps({
         "status": "created",
@@ -201,6 +601,7 @@ COMMANDS = {
     "today": cmd_today,
     "upcoming": cmd_upcoming,
     "search": cmd_search,
+    "find_slots": cmd_find_slots,
     "create": cmd_create,
 }
 
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
-"""Gmail CLI — inbox, search, read, send, reply.
+"""Gmail CLI — inbox, search, read, thread, offline search, bulk labels,
+attachments, send, reply.
 
 Usage:
     python3 gmail.py <command> [json_args]
@@ -8,194 +9,615 @@ Commands:
     inbox   - List recent inbox messages
     search  - Search with Gmail query syntax
     read    - Read full message content
+    thread  - Read a whole conversation (one request)
+    index   - Add messages to the offline full-text index
+    local_search - Search the offline index (no API calls)
+    modify  - Add/remove labels on many messages (ids or query)
+    archive - Archive many messages (ids or query)
+    mark_read - Mark many messages as read (ids or query)
+    attachments - List or download a message's attachments
     send    - Send a new email
     reply   - Reply to a message (preserves thread)
+
+inbox and search take "cache": true to answer from the local metadata
+cache (gmail_cache.py), synced incrementally via the Gmail history API.
+Bodies seen by read, thread and index feed the offline full-text index.
 """
 
 import base64
 import json
+import os
+import re
+import sqlite3
 import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from email.mime.text import MIMEText
-from html.parser import HTMLParser
+from html import unescape
+from pathlib import Path
 
+import httplib2
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 # Allow importing google_auth from same directory
 sys.path.insert(0, sys.path[0])
-from google_auth import get_credentials
+from google_auth import authorized_http, get_credentials, refresh_credentials
+from google_executor import QUOTA_UNITS, call_with_quota, execute
+from gmail_cache import INDEX_BODY_MAX_CHARS, INDEX_MAX_DAYS, INDEX_PRUNE_INTERVAL, MessageCache
+
+# Gmail accepts up to 100 calls per batch but recommends <= 50 to avoid rate limiting
+METADATA_BATCH_SIZE = 50
+METADATA_HEADERS = ["From", "Subject", "Date"]
+FALLBACK_WORKERS = 8
+
+# Local metadata cache ("cache": true): how much a full resync pulls, and how
+# old (seconds) the last sync may be before inbox/search sync again first
+FULL_SYNC_MESSAGES = 500
+DEFAULT_CACHE_MAX_AGE = 60
+HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+# Labels whose addition can bring an uncached message into inbox/unread views
+SURFACING_LABELS = {"INBOX", "UNREAD"}
+
+# read: body characters returned per call ("max_chars"; null for no limit)
+DEFAULT_BODY_MAX_CHARS = 50000
+
+# thread: body characters per message, counted after quoted text is removed
+DEFAULT_THREAD_MAX_CHARS = 10000
+QUOTE_ATTRIBUTION_RE = re.compile(
+    r"^(On .+ wrote:|-{2,}\s*Original Message\s*-{2,})$",
+    re.IGNORECASE,
+)
+
+# index: full-format messages per batch request (payloads are large)
+INDEX_BATCH_SIZE = 20
+
+# Bulk label changes: Gmail's batchModify accepts up to 1000 ids per call;
+# query-selected messages are capped at "max" (default below)
+BATCH_MODIFY_SIZE = 1000
+BATCH_MODIFY_DEFAULT_MAX = 500
+SYSTEM_LABELS = {"INBOX", "UNREAD", "STARRED", "IMPORTANT", "SPAM", "TRASH", "SENT", "DRAFT",
+                 "CATEGORY_PERSONAL", "CATEGORY_SOCIAL", "CATEGORY_PROMOTIONS",
+                 "CATEGORY_UPDATES", "CATEGORY_FORUMS"}
+
+# Attachments are streamed straight from the REST endpoint (fields=data keeps
+# the response to one JSON string) and decoded chunk by chunk
+ATTACHMENT_URL = (
+    "https://gmail.googleapis.com/gmail/v1/users/me/messages/{msg_id}"
+    "/attachments/{attachment_id}?fields=data"
+)
+ATTACHMENT_DIR = Path.home() / ".openclaw" / "attachments"
+ATTACHMENT_MAX_BYTES = 50 * 1024 * 1024
+ATTACHMENT_CHUNK_SIZE = 64 * 1024
+ATTACHMENT_TIMEOUT = 120
+ATTACHMENT_DATA_RE = re.compile(rb'"data"\s*:\s*"')
+
+# Streaming search ("stream": true): overall result cap unless "max" is given,
+# and a smaller page size so the first results print quickly
+STREAM_DEFAULT_MAX = 1000
+STREAM_PAGE_SIZE = 100
+
+
+# HTML to text: one regex tokenizer pass. Alternatives, in order: comments,
+# <head> (ended by </head> or, when that is missing, by <body>), other
+# elements dropped with their content (group 1), doctype/processing
+# instructions, tags (groups 2-4: slash, name, attributes), text runs, stray
+# "<". Self-closing or unclosed dropped elements fall through to the tag
+# alternative, so only the tag itself is removed. Attribute runs skip over
+# quoted values, which may contain ">".
+HTML_ATTRS = r"""(?:"[^"]*"|'[^']*'|[^'">])*"""
+HTML_TOKEN_RE = re.compile(
+    r"<!--.*?(?:-->|$)"
+    r"|<head\b" + HTML_ATTRS + r"(?<!/)>.*?(?:</head\s*>|(?=<body\b))"
+    r"|<(script|style|title|noscript|template|svg)\b" + HTML_ATTRS + r"(?<!/)>.*?</\1\s*>"
+    r"|<[!?][^>]*>"
+    r"|<(/?)([a-zA-Z][a-zA-Z0-9:-]*)(" + HTML_ATTRS + r")>"
+    r"|[^<]+"
+    r"|<",
+    re.DOTALL | re.IGNORECASE,
+)
+HTML_ATTR_RE = re.compile(r"""([\w:-]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+# Zero-width characters pad email preheaders; treat them as whitespace
+HTML_ZERO_WIDTH = str.maketrans(dict.fromkeys("\u034f\u200b\u200c\u200d\u2060\ufeff", " "))
+HTML_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"}
+HTML_BLOCK_TAGS = {"address", "article", "aside", "dd", "div", "dl", "dt", "figure", "footer",
+                   "form", "header", "li", "main", "nav", "pre", "section", "tr"}
+HTML_PARAGRAPH_TAGS = {"blockquote", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "ol", "p", "table", "ul"}
+HTML_CELL_TAGS = {"td", "th"}
+
+
+def is_hidden(attrs: str) -> bool:
+    """True if a tag's attribute string hides the element from readers."""
+    lowered = attrs.lower()
+    if "hidden" not in lowered and "none" not in lowered and "mso-hide" not in lowered:
+        return False
+    for m in HTML_ATTR_RE.finditer(lowered):
+        name = m.group(1)
+        value = m.group(2) or m.group(3) or m.group(4) or ""
+        if name == "hidden" or (name == "aria-hidden" and value == "true"):
+            return True
+        if name == "style":
+            style = value.replace(" ", "")
+            if "display:none" in style or "visibility:hidden" in style or "mso-hide:all" in style:
+                return True
+    return False
+
+
+def html_to_text(html: str, max_chars: int | None = None) -> str:
+    """Convert HTML to readable plain text.
+
+    Drops <head>, scripts, styles and hidden elements, collapses whitespace
+    and turns block elements into line breaks (at most one blank line in a
+    row). Tokenizing stops once max_chars characters have been produced.
+    """
+    out = []
+    size = 0
+    newlines = 0          # line breaks owed before the next text
+    trailing_space = False
+    hidden_tag = None     # tag name whose subtree is being skipped
+    hidden_depth = 0
+
+    for m in HTML_TOKEN_RE.finditer(html):
+        token = m.group(0)
+        tag = m.group(3)
+
+        if hidden_tag is not None:
+            if tag and tag.lower() == hidden_tag:
+                hidden_depth += -1 if m.group(2) else 1
+                if hidden_depth == 0:
+                    hidden_tag = None
+            continue
+
+        if tag:
+            tag = tag.lower()
+            attrs = m.group(4)
+            closing = m.group(2)
+            if not closing and tag not in HTML_VOID_TAGS and not attrs.endswith("/") and is_hidden(attrs):
+                hidden_tag, hidden_depth = tag, 1
+            elif tag == "br":
+                newlines = min(newlines + 1, 2)
+            elif tag in HTML_PARAGRAPH_TAGS:
+                newlines = 2
+            elif tag in HTML_BLOCK_TAGS:
+                newlines = max(newlines, 1)
+            elif tag in HTML_CELL_TAGS and closing and not newlines and out and not trailing_space:
+                out.append(" ")
+                size += 1
+                trailing_space = True
+            continue
+
+        if token[0] == "<" and token != "<":
+            continue  # comment, dropped element, doctype
+
+        if "&" in token:
+            token = unescape(token)
+        if not token.isascii():
+            token = token.translate(HTML_ZERO_WIDTH)
+        text = " ".join(token.split())
+        if not text:
+            if out and not newlines and not trailing_space:
+                out.append(" ")
+                size += 1
+                trailing_space = True
+            continue
+        if token[0].isspace() and out and not newlines and not trailing_space:
+            text = " " + text
+        if token[-1].isspace():
+            text += " "
+
+        if newlines and out:
+            if trailing_space:
+                out[-1] = out[-1][:-1]
+                size -= 1
+            out.append("\n" * newlines)
+            size += newlines
+        newlines = 0
+        out.append(text)
+        size += len(text)
+        trailing_space = text.endswith(" ")
+        if max_chars is not None and size >= max_chars:
+            break
+
+    text = "".join(out).rstrip()
+    return text if max_chars is None else text[:max_chars]
 
 
-class HTMLTextExtractor(HTMLParser):
-    """Simple HTML to plain text converter."""
+def get_service():
+    creds = get_credentials()
+    return build("gmail", "v1", credentials=creds)
 
-    def __init__(self):
-        super().__init__()
-        self._text = []
-        self._skip = False
 
-    def handle_starttag(self, tag, attrs):
-        if tag in ("script", "style"):
-            self._skip = True
-        elif tag == "br":
-            self._text.append("\n")
-        elif tag in ("p", "div", "tr", "li"):
-            self._text.append("\n")
+def get_header(headers: list, name: str) -> str:
+    for h in headers:
+        if h["name"].lower() == name.lower():
+            return h["value"]
+    return ""
 
-    def handle_endtag(self, tag):
-        if tag in ("script", "style"):
-            self._skip = False
 
-    def handle_data(self, data):
-        if not self._skip:
-            self._text.append(data)
+def summarize_message(msg: dict) -> dict:
+    """Format a metadata-format message for inbox/search output."""
+    headers = msg.get("payload", {}).get("headers", [])
+    label_ids = msg.get("labelIds", [])
 
-    def get_text(self):
-        return "".join(self._text).strip()
+    return {
+        "id": msg["id"],
+        "threadId": msg.get("threadId", ""),
+        "from": get_header(headers, "From"),
+        "subject": get_header(headers, "Subject"),
+        "date": get_header(headers, "Date"),
+        "snippet": msg.get("snippet", ""),
+        "unread": "UNREAD" in label_ids,
+    }
 
 
-def html_to_text(html: str) -> str:
-    extractor = HTMLTextExtractor()
-    extractor.feed(html)
-    return extractor.get_text()
+_thread_local = threading.local()
 
 
-def get_service():
-    creds = get_credentials()
-    return build("gmail", "v1", credentials=creds)
+def _fetch_message_one(msg_id: str, params: dict) -> dict:
+    # httplib2 connections aren't thread-safe, so each worker gets its own
+    # connection, sharing the credentials fetch_messages already refreshed
+    if not hasattr(_thread_local, "service"):
+        _thread_local.service = build("gmail", "v1", http=authorized_http(get_credentials()))
+    return execute(_thread_local.service.users().messages().get(userId="me", id=msg_id, **params))
 
 
-def get_header(headers: list, name: str) -> str:
-    for h in headers:
-        if h["name"].lower() == name.lower():
-            return h["value"]
-    return ""
+def fetch_messages(service, message_ids: list, batch_size: int = METADATA_BATCH_SIZE, **params) -> list:
+    """Fetch many messages, preserving the order of message_ids.
 
+    Requests go out as Gmail batch HTTP calls of batch_size, with params
+    passed to messages().get(). Any message the batch couldn't return (a
+    failed batch, or a per-message error such as rate limiting) is
+    refetched individually on a thread pool.
+    """
+    results = {}
+    retry = []
 
-def extract_body(payload: dict) -> str:
-    """Extract plain text body from message payload."""
-    # Simple single-part message
-    if payload.get("body", {}).get("data"):
-        mime = payload.get("mimeType", "")
-        data = base64.urlsafe_b64decode(payload["body"]["data"]).decode("utf-8", errors="replace")
-        if mime == "text/html":
-            return html_to_text(data)
-        return data
+    for start in range(0, len(message_ids), batch_size):
+        chunk = message_ids[start:start + batch_size]
 
-    # Multipart — look for text/plain first, then text/html
-    parts = payload.get("parts", [])
-    plain_text = None
-    html_text = None
+        def on_response(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
 
-    for part in parts:
-        mime = part.get("mimeType", "")
-        if mime == "multipart/alternative" or mime.startswith("multipart/"):
-            # Recurse into nested multipart
-            result = extract_body(part)
-            if result:
-                return result
-        elif mime == "text/plain" and part.get("body", {}).get("data"):
-            data = base64.urlsafe_b64decode(part["body"]["data"]).decode("utf-8", errors="replace")
-            plain_text = data
-        elif mime == "text/html" and part.get("body", {}).get("data"):
-            data = base64.urlsafe_b64decode(part["body"]["data"]).decode("utf-8", errors="replace")
-            html_text = data
-
-    if plain_text:
-        return plain_text
-    if html_text:
-        return html_to_text(html_text)
-
-    # Last resort: recurse all parts
-    for part in parts:
-        result = extract_body(part)
-        if result:
-            return result
+        batch = service.new_batch_http_request(callback=on_response)
+        for msg_id in chunk:
+            batch.add(service.users().messages().get(userId="me", id=msg_id, **params), request_id=msg_id)
+        try:
+            execute(batch, api="gmail", units=QUOTA_UNITS["gmail.users.messages.get"] * len(chunk))
+        except HttpError:
+            pass
+        retry.extend(msg_id for msg_id in chunk if msg_id not in results)
 
-    return ""
+    if retry:
+        refresh_credentials(get_credentials())
+        with ThreadPoolExecutor(max_workers=min(FALLBACK_WORKERS, len(retry))) as pool:
+            for msg_id, msg in zip(retry, pool.map(lambda i: _fetch_message_one(i, params), retry)):
+                results[msg_id] = msg
 
+    return [results[msg_id] for msg_id in message_ids]
 
-def cmd_inbox(args: dict):
-    """List recent inbox messages."""
-    max_results = args.get("max", 10)
-    unread_only = args.get("unread_only", False)
 
-    service = get_service()
-    label_ids = ["INBOX"]
-    if unread_only:
-        label_ids.append("UNREAD")
+def fetch_metadata(service, message_ids: list) -> list:
+    """Fetch inbox/search metadata for many messages, in order."""
+    return fetch_messages(service, message_ids, format="metadata", metadataHeaders=METADATA_HEADERS)
 
-    results = service.users().messages().list(
-        userId="me", labelIds=label_ids, maxResults=max_results
-    ).execute()
+
+def print_summaries(output: list):
+    print(json.dumps({"messages": output, "count": len(output)}))
+
+
+def print_message_list(service, **list_kwargs):
+    """List messages and print their metadata summaries (inbox/search)."""
+    results = execute(service.users().messages().list(userId="me", **list_kwargs))
 
     messages = results.get("messages", [])
     if not messages:
-        print(json.dumps({"messages": [], "count": 0}))
+        print_summaries([])
         return
 
-    output = []
-    for msg_stub in messages:
-        msg = service.users().messages().get(
-            userId="me", id=msg_stub["id"], format="metadata",
-            metadataHeaders=["From", "Subject", "Date"]
-        ).execute()
+    fetched = fetch_metadata(service, [m["id"] for m in messages])
+    print_summaries([summarize_message(msg) for msg in fetched])
+
+
+def list_message_ids(service, limit: int, **list_kwargs) -> list:
+    """Page through messages().list() collecting up to `limit` ids."""
+    ids = []
+    page_token = None
+    while len(ids) < limit:
+        results = execute(service.users().messages().list(
+            userId="me", maxResults=min(500, limit - len(ids)), pageToken=page_token, **list_kwargs
+        ))
+        ids.extend(m["id"] for m in results.get("messages", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+    return ids
+
+
+def full_sync(service, cache: MessageCache):
+    """Rebuild the cache from the newest messages plus all unread inbox mail."""
+    # Read historyId first so changes made while listing are replayed next sync
+    history_id = execute(service.users().getProfile(userId="me"))["historyId"]
+
+    ids = list_message_ids(service, FULL_SYNC_MESSAGES)
+    seen = set(ids)
+    ids += [i for i in list_message_ids(service, FULL_SYNC_MESSAGES, labelIds=["INBOX", "UNREAD"])
+            if i not in seen]
+
+    cache.clear()
+    cache.upsert(fetch_metadata(service, ids))
+    cache.mark_synced(history_id)
+
+
+def sync_cache(service, cache: MessageCache):
+    """Apply mailbox changes since the cached historyId.
+
+    Label changes that add INBOX or UNREAD to an uncached message fetch it.
+    Falls back to a full resync when there is no cached historyId or Gmail
+    reports it as expired (404).
+    """
+    if not cache.history_id:
+        full_sync(service, cache)
+        return
 
-        headers = msg.get("payload", {}).get("headers", [])
-        label_ids_msg = msg.get("labelIds", [])
+    added = {}
+    deleted = set()
+    labels = {}
+    surfaced = set()
+    page_token = None
+    while True:
+        try:
+            results = execute(service.users().history().list(
+                userId="me",
+                startHistoryId=cache.history_id,
+                historyTypes=HISTORY_TYPES,
+                pageToken=page_token,
+            ))
+        except HttpError as e:
+            if e.resp.status == 404:
+                full_sync(service, cache)
+                return
+            raise
+
+        for record in results.get("history", []):
+            for item in record.get("messagesAdded", []):
+                msg_id = item["message"]["id"]
+                added[msg_id] = True
+                deleted.discard(msg_id)
+            for item in record.get("messagesDeleted", []):
+                msg_id = item["message"]["id"]
+                deleted.add(msg_id)
+                added.pop(msg_id, None)
+                labels.pop(msg_id, None)
+            for item in record.get("labelsAdded", []) + record.get("labelsRemoved", []):
+                msg = item["message"]
+                labels[msg["id"]] = msg.get("labelIds", [])
+            for item in record.get("labelsAdded", []):
+                if SURFACING_LABELS.intersection(item.get("labelIds", [])):
+                    surfaced.add(item["message"]["id"])
+
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+
+    cache.delete(list(deleted))
+    # An older message that is marked unread, un-archived or back from snooze
+    # may not be cached yet; fetch it rather than dropping the label change
+    cached = cache.lookup([i for i in labels if i not in added])
+    for msg_id, label_ids in labels.items():
+        if msg_id in added:
+            continue
+        if msg_id in cached:
+            cache.set_labels(msg_id, label_ids)
+        elif msg_id in surfaced and SURFACING_LABELS.intersection(label_ids):
+            added[msg_id] = True
+    if added:
+        cache.upsert(fetch_metadata(service, list(added)))
+    cache.mark_synced(results["historyId"])
+
+
+def resolve_summaries(service, ids: list, cache: MessageCache | None = None) -> list:
+    """Summaries for ids in order, taken from the cache where possible."""
+    if cache is None:
+        return [summarize_message(msg) for msg in fetch_metadata(service, ids)]
+
+    found = cache.lookup(ids)
+    missing = [i for i in ids if i not in found]
+    if missing:
+        fetched = fetch_metadata(service, missing)
+        cache.upsert(fetched)
+        cache.commit()
+        found.update((msg["id"], summarize_message(msg)) for msg in fetched)
+    return [found[i] for i in ids]
+
+
+def iter_search(service, query: str, limit: int, cache: MessageCache | None = None,
+                page_size: int = 500):
+    """Yield summaries of messages matching query, newest first, up to limit.
+
+    Pages are listed lazily and each page's metadata is fetched as it
+    arrives, so stopping early skips the remaining pages. Gmail still
+    resolves the query when a cache is given; only metadata comes from it.
+    """
+    page_token = None
+    remaining = limit
+    while remaining > 0:
+        results = execute(service.users().messages().list(
+            userId="me", q=query, maxResults=min(page_size, remaining), pageToken=page_token
+        ))
+        ids = [m["id"] for m in results.get("messages", [])][:remaining]
+        yield from resolve_summaries(service, ids, cache)
+
+        remaining -= len(ids)
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+
+
+def open_cache(service, args: dict) -> MessageCache:
+    """Open the cache, syncing first unless it is fresher than args["max_age"]."""
+    cache = MessageCache()
+    age = cache.age()
+    if age is None or age > args.get("max_age", DEFAULT_CACHE_MAX_AGE):
+        sync_cache(service, cache)
+    return cache
+
+
+def is_attachment(part: dict) -> bool:
+    if part.get("filename"):
+        return True
+    disposition = get_header(part.get("headers", []), "Content-Disposition")
+    return disposition.lower().startswith("attachment")
+
+
+def find_body_part(payload: dict) -> dict | None:
+    """Pick the MIME part holding the message body, without decoding anything.
+
+    Walks the tree once, depth-first in document order, skipping attachments
+    and their subtrees. The first inline text/plain part wins, then the first
+    text/html, then any other text/* part.
+    """
+    html_part = None
+    other_part = None
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        if is_attachment(part):
+            continue
+        if part.get("parts"):
+            stack.extend(reversed(part["parts"]))
+            continue
+        if not part.get("body", {}).get("data"):
+            continue
 
-        output.append({
-            "id": msg["id"],
-            "threadId": msg.get("threadId", ""),
-            "from": get_header(headers, "From"),
-            "subject": get_header(headers, "Subject"),
-            "date": get_header(headers, "Date"),
-            "snippet": msg.get("snippet", ""),
-            "unread": "UNREAD" in label_ids_msg,
-        })
+        mime = part.get("mimeType", "")
+        if mime == "text/plain":
+            return part
+        if mime == "text/html":
+            html_part = html_part or part
+        elif mime.startswith("text/"):
+            other_part = other_part or part
+    return html_part or other_part
+
+
+def extract_body(payload: dict, max_chars: int | None = None, offset: int = 0) -> tuple:
+    """Extract the plain text body from a message payload.
+
+    Returns (text, full_length): text is at most max_chars characters
+    starting at offset, and full_length is the length of the whole body so
+    callers can page through the rest. HTML conversion stops one character
+    past the budget, so full_length is None when an HTML body was cut short.
+    """
+    part = find_body_part(payload)
+    if part is None:
+        return "", 0
+
+    end = None if max_chars is None else offset + max_chars
+    text = base64.urlsafe_b64decode(part["body"]["data"]).decode("utf-8", errors="replace")
+    if part.get("mimeType") == "text/html":
+        text = html_to_text(text, None if end is None else end + 1)
+        if end is not None and len(text) > end:
+            return text[offset:end], None
+
+    return text[offset:end], len(text)
+
+
+def strip_quoted(text: str) -> str:
+    """Remove quoted reply text from a plain-text message body.
+
+    Drops ">"-prefixed lines and everything from the first reply
+    attribution ("On ... wrote:", "-----Original Message-----", or an
+    Outlook "From:/Sent:" header block) onwards.
+    """
+    lines = text.split("\n")
+    kept = []
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if QUOTE_ATTRIBUTION_RE.match(stripped):
+            break
+        # Attributions are often wrapped: "On Mon, Jan 5, 2026 at 9:00 AM Name <addr>\nwrote:"
+        if stripped.startswith("On ") and i + 1 < len(lines) and lines[i + 1].strip().endswith("wrote:"):
+            break
+        if stripped.startswith("From:") and any(
+            l.strip().startswith("Sent:") for l in lines[i + 1:i + 4]
+        ):
+            break
+        if stripped.startswith(">"):
+            continue
+        kept.append(line)
+
+    if kept and set(kept[-1].strip()) == {"_"}:
+        kept.pop()  # Outlook separator line above the header block
+    return "\n".join(kept).rstrip()
+
+
+def index_bodies(pairs: list):
+    """Add (message, body) pairs to the offline full-text index.
+
+    Enforces the index bounds at most every INDEX_PRUNE_INTERVAL seconds.
+    Best effort: read/thread must not fail because the local index is
+    locked or unwritable.
+    """
+    try:
+        with MessageCache() as cache:
+            for msg, body in pairs:
+                cache.index(msg, strip_quoted(body))
+            pruned_at = cache.get_meta("index_pruned_at")
+            if not pruned_at or time.time() - float(pruned_at) > INDEX_PRUNE_INTERVAL:
+                cache.prune_index()
+            cache.commit()
+    except sqlite3.Error:
+        pass
 
-    print(json.dumps({"messages": output, "count": len(output)}))
+
+def cmd_inbox(args: dict):
+    """List recent inbox messages."""
+    max_results = args.get("max", 10)
+    unread_only = args.get("unread_only", False)
+
+    service = get_service()
+    if args.get("cache"):
+        with open_cache(service, args) as cache:
+            print_summaries(cache.inbox(max_results, unread_only))
+        return
+
+    label_ids = ["INBOX"]
+    if unread_only:
+        label_ids.append("UNREAD")
+
+    print_message_list(service, labelIds=label_ids, maxResults=max_results)
 
 
 def cmd_search(args: dict):
-    """Search with Gmail query syntax."""
+    """Search with Gmail query syntax.
+
+    Follows nextPageToken up to "max" results. With "stream": true, each
+    message is printed as a JSONL line as soon as its page is fetched,
+    followed by a {"type": "end"} line.
+    """
     query = args.get("query", "")
-    max_results = args.get("max", 10)
+    stream = args.get("stream", False)
+    max_results = args.get("max", STREAM_DEFAULT_MAX if stream else 10)
 
     if not query:
         print(json.dumps({"error": "Missing 'query' argument", "type": "invalid_args"}))
         return
 
     service = get_service()
-    results = service.users().messages().list(
-        userId="me", q=query, maxResults=max_results
-    ).execute()
+    with open_cache(service, args) if args.get("cache") else nullcontext() as cache:
+        if not stream:
+            print_summaries(list(iter_search(service, query, max_results, cache)))
+            return
 
-    messages = results.get("messages", [])
-    if not messages:
-        print(json.dumps({"messages": [], "count": 0}))
-        return
-
-    output = []
-    for msg_stub in messages:
-        msg = service.users().messages().get(
-            userId="me", id=msg_stub["id"], format="metadata",
-            metadataHeaders=["From", "Subject", "Date"]
-        ).execute()
-
-        headers = msg.get("payload", {}).get("headers", [])
-        label_ids_msg = msg.get("labelIds", [])
-
-        output.append({
-            "id": msg["id"],
-            "threadId": msg.get("threadId", ""),
-            "from": get_header(headers, "From"),
-            "subject": get_header(headers, "Subject"),
-            "date": get_header(headers, "Date"),
-            "snippet": msg.get("snippet", ""),
-            "unread": "UNREAD" in label_ids_msg,
-        })
-
-    print(json.dumps({"messages": output, "count": len(output)}))
+        count = 0
+        for summary in iter_search(service, query, max_results, cache, STREAM_PAGE_SIZE):
+            print(json.dumps(summary), flush=True)
+            count += 1
+        print(json.dumps({"type": "end", "count": count, "capped": count >= max_results}), flush=True)
 
 
 def cmd_read(args: dict):
@@ -206,12 +628,19 @@ def cmd_read(args: dict):
         return
 
     service = get_service()
-    msg = service.users().messages().get(
+    msg = execute(service.users().messages().get(
         userId="me", id=msg_id, format="full"
-    ).execute()
+    ))
 
     headers = msg.get("payload", {}).get("headers", [])
-    body = extract_body(msg.get("payload", {}))
+    offset = args.get("offset", 0)
+    body, body_length = extract_body(
+        msg.get("payload", {}), args.get("max_chars", DEFAULT_BODY_MAX_CHARS), offset
+    )
+    end = offset + len(body)
+    truncated = body_length is None or end < body_length
+    if offset == 0 and not truncated:
+        index_bodies([(msg, body)])
 
     print(json.dumps({
         "id": msg["id"],
@@ -223,10 +652,384 @@ def cmd_read(args: dict):
         "date": get_header(headers, "Date"),
         "message_id": get_header(headers, "Message-ID"),
         "body": body,
+        "body_length": body_length,
+        # HTML conversion stops one character past the budget, so a cut-short
+        # HTML body is known to be at least that long
+        "body_length_at_least": end + 1 if body_length is None else body_length,
+        "truncated": truncated,
+        "next_offset": end if truncated else None,
         "labels": msg.get("labelIds", []),
     }))
 
 
+def cmd_thread(args: dict):
+    """Read a whole conversation with a single threads().get request."""
+    thread_id = args.get("id", "")
+    if not thread_id:
+        print(json.dumps({"error": "Missing 'id' argument", "type": "invalid_args"}))
+        return
+
+    max_chars = args.get("max_chars", DEFAULT_THREAD_MAX_CHARS)
+    keep_quotes = args.get("keep_quotes", False)
+
+    service = get_service()
+    thread = execute(service.users().threads().get(userId="me", id=thread_id, format="full"))
+
+    messages = []
+    extracted = []
+    for msg in thread.get("messages", []):
+        headers = msg.get("payload", {}).get("headers", [])
+        # Quotes are stripped before the budget applies, so the whole body is extracted
+        body, _ = extract_body(msg.get("payload", {}))
+        extracted.append((msg, body))
+        if not keep_quotes:
+            body = strip_quoted(body)
+        body_length = len(body)
+        if max_chars is not None:
+            body = body[:max_chars]
+
+        messages.append({
+            "id": msg["id"],
+            "from": get_header(headers, "From"),
+            "to": get_header(headers, "To"),
+            "cc": get_header(headers, "Cc"),
+            "date": get_header(headers, "Date"),
+            "subject": get_header(headers, "Subject"),
+            "message_id": get_header(headers, "Message-ID"),
+            "body": body,
+            "body_length": body_length,
+            "truncated": len(body) < body_length,
+            "unread": "UNREAD" in msg.get("labelIds", []),
+            "labels": msg.get("labelIds", []),
+        })
+
+    index_bodies(extracted)
+
+    print(json.dumps({
+        "id": thread.get("id", thread_id),
+        "subject": messages[0]["subject"] if messages else "",
+        "count": len(messages),
+        "messages": messages,
+    }))
+
+
+def cmd_index(args: dict):
+    """Add messages matching a query to the offline full-text index."""
+    query = args.get("query", f"newer_than:{INDEX_MAX_DAYS}d")
+    max_results = args.get("max", 500)
+
+    service = get_service()
+    ids = list_message_ids(service, max_results, q=query)
+    with MessageCache() as cache:
+        if args.get("refresh"):
+            todo = ids
+        else:
+            already = cache.indexed(ids)
+            todo = [i for i in ids if i not in already]
+        for start in range(0, len(todo), INDEX_BATCH_SIZE):
+            chunk = todo[start:start + INDEX_BATCH_SIZE]
+            for msg in fetch_messages(service, chunk, INDEX_BATCH_SIZE, format="full"):
+                body, _ = extract_body(msg.get("payload", {}), INDEX_BODY_MAX_CHARS)
+                cache.index(msg, strip_quoted(body))
+            cache.commit()
+        pruned = cache.prune_index()
+        cache.commit()
+
+        print(json.dumps({
+            "matched": len(ids),
+            "added": len(todo),
+            "pruned": pruned,
+            **cache.index_stats(),
+        }))
+
+
+def cmd_local_search(args: dict):
+    """Search the offline full-text index with Gmail-style operators."""
+    query = args.get("query", "")
+    max_results = args.get("max", 10)
+
+    if not query:
+        print(json.dumps({"error": "Missing 'query' argument", "type": "invalid_args"}))
+        return
+
+    with MessageCache() as cache:
+        try:
+            output = cache.search(query, max_results, args.get("sort", "date"))
+        except ValueError as e:
+            print(json.dumps({"error": str(e), "type": "unsupported_query"}))
+            return
+        stats = cache.index_stats()
+
+    print(json.dumps({"messages": output, "count": len(output), "indexed": stats["indexed"]}))
+
+
+def resolve_label_ids(service, names: list) -> list:
+    """Map label names to ids; system labels (INBOX, UNREAD, ...) pass through."""
+    if all(name.upper() in SYSTEM_LABELS for name in names):
+        return [name.upper() for name in names]
+
+    labels = execute(service.users().labels().list(userId="me")).get("labels", [])
+    by_name = {label["name"].lower(): label["id"] for label in labels}
+    by_id = {label["id"] for label in labels}
+
+    ids = []
+    for name in names:
+        if name.upper() in SYSTEM_LABELS:
+            ids.append(name.upper())
+        elif name in by_id:
+            ids.append(name)
+        elif name.lower() in by_name:
+            ids.append(by_name[name.lower()])
+        else:
+            raise ValueError(f"Unknown label: {name}")
+    return ids
+
+
+def batch_modify(args: dict, add: list, remove: list):
+    """Apply label changes to args["ids"] (a list) or messages matching args["query"].
+
+    Uses messages().batchModify in chunks of BATCH_MODIFY_SIZE ids. With
+    "dry_run": true, only reports which messages would change.
+    """
+    ids = args.get("ids", [])
+    query = args.get("query", "")
+    if not ids and not query:
+        print(json.dumps({"error": "Provide 'ids' or 'query'", "type": "invalid_args"}))
+        return
+    if ids and query:
+        print(json.dumps({"error": "Provide either 'ids' or 'query', not both", "type": "invalid_args"}))
+        return
+    if not isinstance(ids, list) or not all(isinstance(i, str) for i in ids):
+        print(json.dumps({"error": "'ids' must be a list of message ids", "type": "invalid_args"}))
+        return
+    if not add and not remove:
+        print(json.dumps({"error": "Provide 'add' and/or 'remove' labels", "type": "invalid_args"}))
+        return
+
+    service = get_service()
+    try:
+        add_ids = resolve_label_ids(service, add)
+        remove_ids = resolve_label_ids(service, remove)
+    except ValueError as e:
+        print(json.dumps({"error": str(e), "type": "invalid_args"}))
+        return
+
+    if query:
+        ids = list_message_ids(service, args.get("max", BATCH_MODIFY_DEFAULT_MAX), q=query)
+
+    if args.get("dry_run"):
+        print(json.dumps({"status": "dry_run", "count": len(ids), "ids": ids,
+                          "add": add_ids, "remove": remove_ids}))
+        return
+
+    requests = 0
+    for start in range(0, len(ids), BATCH_MODIFY_SIZE):
+        execute(service.users().messages().batchModify(userId="me", body={
+            "ids": ids[start:start + BATCH_MODIFY_SIZE],
+            "addLabelIds": add_ids,
+            "removeLabelIds": remove_ids,
+        }))
+        requests += 1
+
+    print(json.dumps({"status": "modified", "count": len(ids), "requests": requests,
+                      "add": add_ids, "remove": remove_ids}))
+
+
+def cmd_modify(args: dict):
+    """Add/remove labels on many messages."""
+    batch_modify(args, args.get("add", []), args.get("remove", []))
+
+
+def cmd_archive(args: dict):
+    """Archive messages (remove from inbox)."""
+    batch_modify(args, [], ["INBOX"])
+
+
+def cmd_mark_read(args: dict):
+    """Mark messages as read."""
+    batch_modify(args, [], ["UNREAD"])
+
+
+def list_attachments(payload: dict) -> list:
+    """Return the attachment parts of a message payload in document order."""
+    found = []
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        stack.extend(reversed(part.get("parts", [])))
+        body = part.get("body", {})
+        if part.get("filename") and (body.get("attachmentId") or body.get("data")):
+            found.append(part)
+    return found
+
+
+def safe_filename(name: str, directory: Path) -> Path:
+    """A path in directory for name, without separators and not clobbering files."""
+    name = re.sub(r"[\\/\x00]", "_", name).strip(". ") or "attachment"
+    path = directory / name
+    stem, suffix = path.stem, path.suffix
+    n = 1
+    while path.exists():
+        path = directory / f"{stem} ({n}){suffix}"
+        n += 1
+    return path
+
+
+def decode_base64_stream(chunks, out, max_bytes: int) -> int:
+    """Decode a base64url string arriving in pieces, writing bytes to out.
+
+    chunks yields bytes that start inside the string and may run past its
+    closing quote. Input is decoded in 4-character groups, so memory stays
+    bounded by the chunk size. Returns the decoded byte count; raises
+    ValueError once it would exceed max_bytes.
+    """
+    pending = b""
+    written = 0
+    for chunk in chunks:
+        end = chunk.find(b'"')
+        pending += chunk if end < 0 else chunk[:end]
+        usable = len(pending) - len(pending) % 4
+        if usable:
+            data = base64.urlsafe_b64decode(pending[:usable])
+            pending = pending[usable:]
+            written += len(data)
+            if written > max_bytes:
+                raise ValueError(f"Attachment exceeds max_bytes ({max_bytes})")
+            out.write(data)
+        if end >= 0:
+            break
+    else:
+        raise ValueError("Attachment response ended inside the data field")
+
+    if pending:
+        data = base64.urlsafe_b64decode(pending + b"=" * (-len(pending) % 4))
+        written += len(data)
+        if written > max_bytes:
+            raise ValueError(f"Attachment exceeds max_bytes ({max_bytes})")
+        out.write(data)
+    return written
+
+
+def iter_data_field(response, chunk_size: int = ATTACHMENT_CHUNK_SIZE):
+    """Yield a JSON response's "data" string in chunks, from just after its opening quote."""
+    head = b""
+    while True:
+        chunk = response.read(chunk_size)
+        if not chunk:
+            raise ValueError("Attachment response has no data field")
+        head += chunk
+        m = ATTACHMENT_DATA_RE.search(head)
+        if m:
+            break
+        if len(head) > chunk_size * 4:
+            raise ValueError("Attachment response has no data field")
+
+    yield head[m.end():]
+    while chunk := response.read(chunk_size):
+        yield chunk
+
+
+def stream_attachment(url: str, token: str, out, max_bytes: int) -> int:
+    """GET one attachment and decode it into out; returns the decoded size.
+
+    Error responses are raised as HttpError, so call_with_quota can back
+    off on rate limits the same way execute() does.
+    """
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    try:
+        with urllib.request.urlopen(request, timeout=ATTACHMENT_TIMEOUT) as response:
+            # A retried attempt starts the file over
+            out.seek(0)
+            out.truncate()
+            return decode_base64_stream(iter_data_field(response), out, max_bytes)
+    except urllib.error.HTTPError as e:
+        resp = httplib2.Response({"status": e.code, **dict(e.headers.items())})
+        raise HttpError(resp, e.read(), uri=url) from None
+
+
+def download_attachment(token: str, msg_id: str, part: dict, directory: Path, max_bytes: int) -> dict:
+    """Stream one attachment to directory via a temp file and atomic rename."""
+    body = part.get("body", {})
+    path = safe_filename(part["filename"], directory)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    try:
+        with open(tmp, "wb") as out:
+            if body.get("data"):
+                size = decode_base64_stream([body["data"].encode() + b'"'], out, max_bytes)
+            else:
+                url = ATTACHMENT_URL.format(msg_id=msg_id, attachment_id=body["attachmentId"])
+                size = call_with_quota(
+                    lambda: stream_attachment(url, token, out, max_bytes),
+                    "gmail", QUOTA_UNITS["gmail.users.messages.attachments.get"],
+                )
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    return {"filename": part["filename"], "path": str(path), "bytes": size}
+
+
+def cmd_attachments(args: dict):
+    """List a message's attachments, or download selected ones to disk.
+
+    "download": true saves all of them; an index, a filename, or a list of
+    them saves those. Parts larger than "max_bytes" are refused.
+    """
+    msg_id = args.get("id", "")
+    if not msg_id:
+        print(json.dumps({"error": "Missing 'id' argument", "type": "invalid_args"}))
+        return
+
+    creds = get_credentials()
+    service = build("gmail", "v1", credentials=creds)
+    msg = execute(service.users().messages().get(userId="me", id=msg_id, format="full"))
+
+    parts = list_attachments(msg.get("payload", {}))
+    listing = [
+        {
+            "index": index,
+            "filename": part["filename"],
+            "mimeType": part.get("mimeType", ""),
+            "size": part.get("body", {}).get("size", 0),
+        }
+        for index, part in enumerate(parts)
+    ]
+
+    selection = args.get("download")
+    if isinstance(selection, (str, int)) and not isinstance(selection, bool) and selection != "":
+        selection = [selection]
+    valid = selection is None or isinstance(selection, bool) or (
+        isinstance(selection, list)
+        and all(isinstance(s, (str, int)) and not isinstance(s, bool) for s in selection)
+    )
+    if not valid:
+        print(json.dumps({"error": "'download' must be true, an index, a filename, or a list of them",
+                          "type": "invalid_args"}))
+        return
+    if not selection:
+        print(json.dumps({"id": msg_id, "attachments": listing, "count": len(listing)}))
+        return
+
+    if selection is not True:
+        wanted = set(selection)
+        parts = [p for i, p in enumerate(parts) if i in wanted or p["filename"] in wanted]
+
+    max_bytes = args.get("max_bytes", ATTACHMENT_MAX_BYTES)
+    too_large = [p["filename"] for p in parts if p.get("body", {}).get("size", 0) > max_bytes]
+    if too_large:
+        print(json.dumps({"error": f"Attachments exceed max_bytes ({max_bytes}): {', '.join(too_large)}",
+                          "type": "too_large"}))
+        return
+
+    directory = Path(args.get("dir", ATTACHMENT_DIR)).expanduser()
+    directory.mkdir(parents=True, exist_ok=True)
+    refresh_credentials(creds)
+
+    saved = [download_attachment(creds.token, msg_id, part, directory, max_bytes) for part in parts]
+    print(json.dumps({"id": msg_id, "saved": saved, "count": len(saved)}))
+
+
 def cmd_send(args: dict):
     """Send a new email."""
     to = args.get("to", "")
@@ -246,9 +1049,9 @@ def cmd_send(args: dict):
     message["subject"] = subject
 
     raw = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
-    result = service.users().messages().send(
+    result = execute(service.users().messages().send(
         userId="me", body={"raw": raw}
-    ).execute()
+    ), idempotent=False)
 
     print(json.dumps({
         "status": "sent",
@@ -269,10 +1072,10 @@ def cmd_reply(args: dict):
     service = get_service()
 
     # Fetch original message for thread context
-    original = service.users().messages().get(
+    original = execute(service.users().messages().get(
         userId="me", id=msg_id, format="metadata",
         metadataHeaders=["From", "Subject", "Message-ID", "To"]
-    ).execute()
+    ))
 
     orig_headers = original.get("payload", {}).get("headers", [])
     thread_id = original.get("threadId", "")
@@ -293,9 +1096,9 @@ def cmd_reply(args: dict):
         message["References"] = orig_message_id
 
     raw = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
-    result = service.users().messages().send(
+    result = execute(service.users().messages().send(
         userId="me", body={"raw": raw, "threadId": thread_id}
-    ).execute()
+    ), idempotent=False)
 
     print(json.dumps({
         "status": "sent",
@@ -309,6 +1112,13 @@ COMMANDS = {
     "inbox": cmd_inbox,
     "search": cmd_search,
     "read": cmd_read,
+    "thread": cmd_thread,
+    "index": cmd_index,
+    "local_search": cmd_local_search,
+    "modify": cmd_modify,
+    "archive": cmd_archive,
+    "mark_read": cmd_mark_read,
+    "attachments": cmd_attachments,
     "send": cmd_send,
     "reply": cmd_reply,
 }
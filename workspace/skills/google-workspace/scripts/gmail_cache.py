@@ -0,0 +1,371 @@
+"""Local SQLite store of Gmail message metadata and a full-text index.
+
+Keeps the fields inbox/search print (id, threadId, From, Subject, Date,
+snippet, labels) plus the last synced historyId, so gmail.py can sync
+incrementally instead of re-downloading headers on every run.
+
+Message bodies seen by read/thread/index go into an FTS5 index
+(documents + documents_fts), bounded by age and total size, which
+local_search queries with a subset of Gmail's search operators.
+Used by gmail.py via: from gmail_cache import MessageCache
+"""
+
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+from google_auth import CACHE_DIR
+
+GMAIL_CACHE_DB = CACHE_DIR / "gmail.sqlite3"
+
+# Full-text index bounds: messages older than this many days, then the
+# oldest messages beyond the byte budget, are dropped after each update
+INDEX_MAX_DAYS = int(os.environ.get("GMAIL_INDEX_MAX_DAYS", 365))
+INDEX_MAX_BYTES = int(os.environ.get("GMAIL_INDEX_MAX_BYTES", 200 * 1024 * 1024))
+INDEX_BODY_MAX_CHARS = 100000
+# read/thread add to the index as a side effect; they re-check the bounds
+# at most this often (seconds). The index command always prunes.
+INDEX_PRUNE_INTERVAL = 600
+
+# from:alice  subject:"q1 review"  after:2026/01/01  is:unread  budget
+QUERY_TOKEN_RE = re.compile(r'(-)?(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+QUERY_COLUMNS = {"from": "sender", "to": "recipients", "subject": "subject"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL DEFAULT '',
+    sender TEXT NOT NULL DEFAULT '',
+    subject TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    snippet TEXT NOT NULL DEFAULT '',
+    labels TEXT NOT NULL DEFAULT '[]',
+    internal_date INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS messages_internal_date ON messages (internal_date DESC);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    thread_id TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    snippet TEXT NOT NULL DEFAULT '',
+    labels TEXT NOT NULL DEFAULT '[]',
+    internal_date INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS documents_internal_date ON documents (internal_date);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    sender, recipients, subject, body, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def _header(headers: list, name: str) -> str:
+    for h in headers:
+        if h["name"].lower() == name.lower():
+            return h["value"]
+    return ""
+
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _date_ms(value: str) -> int:
+    """Parse an after:/before: value (YYYY/MM/DD, YYYY-MM-DD or epoch seconds)."""
+    if value.isdigit():
+        return int(value) * 1000
+    return int(datetime.strptime(value.replace("-", "/"), "%Y/%m/%d").timestamp() * 1000)
+
+
+def parse_query(query: str) -> tuple:
+    """Translate Gmail search syntax into (fts_match, sql_where, params).
+
+    Supports from:, to:, subject:, after:, before:, is:unread, is:read,
+    quoted phrases, bare words and -negation. Other operators raise
+    ValueError so callers can fall back to the Gmail API.
+    """
+    terms = []
+    negated = []
+    where = []
+    params = []
+    for m in QUERY_TOKEN_RE.finditer(query):
+        negate, operator, quoted, word = m.groups()
+        value = quoted if quoted is not None else word
+        operator = operator.lower() if operator else None
+        if value == "":
+            continue
+
+        if operator in QUERY_COLUMNS:
+            term = f"{QUERY_COLUMNS[operator]} : {_phrase(value)}"
+        elif operator in ("after", "before"):
+            try:
+                where.append("d.internal_date >= ?" if operator == "after" else "d.internal_date < ?")
+                params.append(_date_ms(value))
+            except ValueError:
+                raise ValueError(f"Invalid date for {operator}: {value}") from None
+            continue
+        elif operator == "is" and value.lower() in ("unread", "read"):
+            clause = "EXISTS (SELECT 1 FROM json_each(d.labels) WHERE value = 'UNREAD')"
+            where.append(clause if value.lower() == "unread" else f"NOT {clause}")
+            continue
+        elif operator:
+            raise ValueError(f"Operator not supported offline: {operator}:")
+        else:
+            term = _phrase(value)
+        (negated if negate else terms).append(term)
+
+    if negated and not terms:
+        raise ValueError("Negated terms need at least one positive term offline")
+    match = " AND ".join(terms)
+    if negated:
+        match += " NOT " + " NOT ".join(negated)
+    return match, where, params
+
+
+def _summary(row: sqlite3.Row) -> dict:
+    """Format a cached row exactly like gmail.summarize_message()."""
+    return {
+        "id": row["id"],
+        "threadId": row["thread_id"],
+        "from": row["sender"],
+        "subject": row["subject"],
+        "date": row["date"],
+        "snippet": row["snippet"],
+        "unread": "UNREAD" in json.loads(row["labels"]),
+    }
+
+
+class MessageCache:
+    """SQLite-backed message metadata cache."""
+
+    def __init__(self, path: Path = GMAIL_CACHE_DB):
+        path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        os.chmod(path, 0o600)
+
+    def close(self):
+        self.conn.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- sync state --
+
+    def get_meta(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    @property
+    def history_id(self) -> str | None:
+        return self.get_meta("history_id")
+
+    def age(self) -> float | None:
+        """Seconds since the last successful sync, or None if never synced."""
+        synced_at = self.get_meta("synced_at")
+        return time.time() - float(synced_at) if synced_at else None
+
+    def mark_synced(self, history_id: str) -> None:
+        self.set_meta("history_id", history_id)
+        self.set_meta("synced_at", time.time())
+        self.conn.commit()
+
+    # -- writes --
+
+    def clear(self) -> None:
+        """Forget cached metadata and sync state (the full-text index is kept)."""
+        self.conn.execute("DELETE FROM messages")
+        self.conn.execute("DELETE FROM meta")
+
+    def upsert(self, messages: list) -> None:
+        """Store metadata-format messages from the Gmail API."""
+        rows = []
+        for msg in messages:
+            headers = msg.get("payload", {}).get("headers", [])
+            rows.append((
+                msg["id"],
+                msg.get("threadId", ""),
+                _header(headers, "From"),
+                _header(headers, "Subject"),
+                _header(headers, "Date"),
+                msg.get("snippet", ""),
+                json.dumps(msg.get("labelIds", [])),
+                int(msg.get("internalDate", 0)),
+            ))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO messages"
+            " (id, thread_id, sender, subject, date, snippet, labels, internal_date)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def set_labels(self, msg_id: str, label_ids: list) -> None:
+        labels = json.dumps(label_ids)
+        self.conn.execute("UPDATE messages SET labels = ? WHERE id = ?", (labels, msg_id))
+        self.conn.execute("UPDATE documents SET labels = ? WHERE id = ?", (labels, msg_id))
+
+    def delete(self, message_ids: list) -> None:
+        self.conn.executemany("DELETE FROM messages WHERE id = ?", [(i,) for i in message_ids])
+        self.unindex(message_ids)
+
+    # -- full-text index --
+
+    def index(self, msg: dict, body: str) -> None:
+        """Add or replace a message (any format with headers) and its body text."""
+        headers = msg.get("payload", {}).get("headers", [])
+        sender = _header(headers, "From")
+        recipients = " ".join(filter(None, (_header(headers, "To"), _header(headers, "Cc"))))
+        subject = _header(headers, "Subject")
+        body = body[:INDEX_BODY_MAX_CHARS]
+
+        self.unindex([msg["id"]])
+        cursor = self.conn.execute(
+            "INSERT INTO documents (id, thread_id, date, snippet, labels, internal_date, bytes)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                msg["id"],
+                msg.get("threadId", ""),
+                _header(headers, "Date"),
+                msg.get("snippet", ""),
+                json.dumps(msg.get("labelIds", [])),
+                int(msg.get("internalDate", 0)),
+                len(sender) + len(recipients) + len(subject) + len(body.encode()),
+            ),
+        )
+        self.conn.execute(
+            "INSERT INTO documents_fts (rowid, sender, recipients, subject, body) VALUES (?, ?, ?, ?, ?)",
+            (cursor.lastrowid, sender, recipients, subject, body),
+        )
+
+    def unindex(self, message_ids: list) -> None:
+        for msg_id in message_ids:
+            row = self.conn.execute("SELECT rowid FROM documents WHERE id = ?", (msg_id,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row[0],))
+                self.conn.execute("DELETE FROM documents WHERE rowid = ?", (row[0],))
+
+    def indexed(self, message_ids: list) -> set:
+        """Return the subset of message_ids already in the full-text index."""
+        found = set()
+        for start in range(0, len(message_ids), 500):
+            chunk = message_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(row[0] for row in self.conn.execute(
+                f"SELECT id FROM documents WHERE id IN ({placeholders})", chunk
+            ))
+        return found
+
+    def prune_index(self, max_days: int = INDEX_MAX_DAYS, max_bytes: int = INDEX_MAX_BYTES) -> int:
+        """Drop expired messages, then the oldest ones over the byte budget."""
+        cutoff = int((time.time() - max_days * 86400) * 1000)
+        doomed = [row[0] for row in self.conn.execute(
+            "SELECT id FROM documents WHERE internal_date < ?", (cutoff,)
+        )]
+
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(bytes), 0) FROM documents WHERE internal_date >= ?", (cutoff,)
+        ).fetchone()[0]
+        if total > max_bytes:
+            for row in self.conn.execute(
+                "SELECT id, bytes FROM documents WHERE internal_date >= ? ORDER BY internal_date",
+                (cutoff,),
+            ):
+                if total <= max_bytes:
+                    break
+                doomed.append(row[0])
+                total -= row[1]
+
+        self.unindex(doomed)
+        self.set_meta("index_pruned_at", time.time())
+        return len(doomed)
+
+    def index_stats(self) -> dict:
+        count, size = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM documents"
+        ).fetchone()
+        return {"indexed": count, "indexed_bytes": size}
+
+    def search(self, query: str, max_results: int, sort: str = "date") -> list:
+        """Run a Gmail-style query against the full-text index.
+
+        Results are newest first, or best match first with sort="relevance".
+        Snippets highlight the matched body text when the query has terms.
+        """
+        match, where, params = parse_query(query)
+        if match:
+            sql = (
+                "SELECT d.*, f.sender, f.subject,"
+                " snippet(documents_fts, 3, '', '', '...', 16) AS excerpt"
+                " FROM documents_fts f JOIN documents d ON d.rowid = f.rowid"
+                " WHERE documents_fts MATCH ?"
+            )
+            params = [match, *params]
+        else:
+            sql = (
+                "SELECT d.*, f.sender, f.subject, d.snippet AS excerpt"
+                " FROM documents d JOIN documents_fts f ON f.rowid = d.rowid WHERE 1"
+            )
+        for clause in where:
+            sql += f" AND {clause}"
+        sql += " ORDER BY " + ("f.rank" if match and sort == "relevance" else "d.internal_date DESC")
+        sql += " LIMIT ?"
+
+        return [
+            {
+                "id": row["id"],
+                "threadId": row["thread_id"],
+                "from": row["sender"],
+                "subject": row["subject"],
+                "date": row["date"],
+                "snippet": row["excerpt"] or row["snippet"],
+                "unread": "UNREAD" in json.loads(row["labels"]),
+            }
+            for row in self.conn.execute(sql, (*params, max_results))
+        ]
+
+    # -- reads --
+
+    def inbox(self, max_results: int, unread_only: bool = False) -> list:
+        """Newest-first INBOX messages, formatted like inbox output."""
+        query = (
+            "SELECT * FROM messages"
+            " WHERE EXISTS (SELECT 1 FROM json_each(labels) WHERE value = 'INBOX')"
+        )
+        if unread_only:
+            query += " AND EXISTS (SELECT 1 FROM json_each(labels) WHERE value = 'UNREAD')"
+        query += " ORDER BY internal_date DESC LIMIT ?"
+        return [_summary(row) for row in self.conn.execute(query, (max_results,))]
+
+    def lookup(self, message_ids: list) -> dict:
+        """Return {id: summary} for the cached subset of message_ids."""
+        found = {}
+        for start in range(0, len(message_ids), 500):
+            chunk = message_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self.conn.execute(
+                f"SELECT * FROM messages WHERE id IN ({placeholders})", chunk
+            ):
+                found[row["id"]] = _summary(row)
+        return found
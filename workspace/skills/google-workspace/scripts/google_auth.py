@@ -1,17 +1,23 @@
 """Shared Google OAuth2 authentication helper.
 
-Builds credentials from environment variables in ~/.openclaw/.env.
+Builds credentials from environment variables in ~/.openclaw/.env, once
+per process, so every service and worker thread shares one access token.
 Used by gmail.py and calendar.py via: from google_auth import get_credentials
+Also defines CACHE_DIR, where the scripts keep local caches and quota state.
 """
 
 import os
 import sys
+import threading
 from pathlib import Path
 
+import httplib2
 from dotenv import load_dotenv
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp, Request
 
 ENV_PATH = Path.home() / ".openclaw" / ".env"
+CACHE_DIR = Path(os.environ.get("OPENCLAW_CACHE_DIR", Path.home() / ".openclaw" / "cache"))
 
 SCOPES = [
     "https://www.googleapis.com/auth/gmail.readonly",
@@ -21,13 +27,21 @@ SCOPES = [
     "https://www.googleapis.com/auth/calendar.events",
 ]
 
+_credentials = None
+_refresh_lock = threading.Lock()
+
 
 def get_credentials() -> Credentials:
     """Build Google OAuth2 credentials from env vars.
 
     Loads GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, GOOGLE_REFRESH_TOKEN
-    from ~/.openclaw/.env and returns a Credentials object.
+    from ~/.openclaw/.env and returns a Credentials object. Later calls
+    return the same object.
     """
+    global _credentials
+    if _credentials is not None:
+        return _credentials
+
     load_dotenv(ENV_PATH)
 
     client_id = os.getenv("GOOGLE_CLIENT_ID")
@@ -58,4 +72,22 @@ def get_credentials() -> Credentials:
         scopes=SCOPES,
     )
 
+    _credentials = creds
     return creds
+
+
+def refresh_credentials(creds: Credentials) -> Credentials:
+    """Fetch an access token now unless creds already hold a valid one.
+
+    Call this before fanning out to worker threads, so they don't each make
+    their own OAuth refresh round trip on their first request.
+    """
+    with _refresh_lock:
+        if not creds.valid:
+            creds.refresh(Request(httplib2.Http()))
+    return creds
+
+
+def authorized_http(creds: Credentials) -> AuthorizedHttp:
+    """An authorized HTTP client with its own connection (httplib2 isn't thread-safe)."""
+    return AuthorizedHttp(creds, http=httplib2.Http())
@@ -0,0 +1,223 @@
+"""Shared request executor for Google API calls.
+
+Every gmail.py/gcalendar.py request goes through execute(), which:
+- charges the method's quota units against a per-API token bucket,
+- caps in-flight requests per API with an AIMD limit (halved on
+  throttling, grown by one per window of successful calls),
+- retries 429/403-rate-limit (and, for idempotent calls, 5xx) responses
+  with jittered exponential backoff, honoring Retry-After.
+
+Bucket levels, concurrency limits and throttle deadlines are persisted in
+a flock-guarded JSON file so concurrent runs (e.g. overlapping heartbeats)
+share one view of the quota.
+Used by gmail.py and gcalendar.py via: from google_executor import execute
+(call_with_quota covers requests made outside googleapiclient).
+"""
+
+import fcntl
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from googleapiclient.errors import HttpError
+
+from google_auth import CACHE_DIR
+
+QUOTA_STATE = CACHE_DIR / "google-quota.json"
+QUOTA_LOCK = CACHE_DIR / "google-quota.lock"
+
+# Per-user quota, in units per second, kept below Google's published limits
+# (Gmail: 250 units/user/s; Calendar: ~600 requests/user/min)
+BUCKETS = {
+    "gmail": {"rate": 200.0, "capacity": 250.0},
+    "calendar": {"rate": 8.0, "capacity": 20.0},
+}
+
+# Quota units per method (Gmail publishes per-method costs; Calendar counts requests)
+QUOTA_UNITS = {
+    "gmail.users.getProfile": 1,
+    "gmail.users.labels.list": 1,
+    "gmail.users.history.list": 2,
+    "gmail.users.messages.list": 5,
+    "gmail.users.messages.get": 5,
+    "gmail.users.messages.attachments.get": 5,
+    "gmail.users.messages.batchModify": 50,
+    "gmail.users.messages.send": 100,
+    "gmail.users.threads.get": 10,
+}
+DEFAULT_UNITS = {"gmail": 5, "calendar": 1}
+
+INITIAL_CONCURRENCY = 8
+MAX_CONCURRENCY = 16
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 32.0
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "quotaExceeded"}
+
+
+def _default_state(api: str) -> dict:
+    return {
+        "tokens": BUCKETS[api]["capacity"],
+        "updated": time.time(),
+        "limit": float(INITIAL_CONCURRENCY),
+        "throttled_until": 0.0,
+    }
+
+
+class QuotaState:
+    """Token buckets and AIMD limits shared across processes via a locked file."""
+
+    def __init__(self):
+        self._successes = {}
+        self._limits = {}
+        self._mutex = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        CACHE_DIR.mkdir(parents=True, exist_ok=True, mode=0o700)
+        with open(QUOTA_LOCK, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                state = json.loads(QUOTA_STATE.read_text())
+            except (OSError, ValueError):
+                state = {}
+            yield state
+            tmp = QUOTA_STATE.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(state))
+            os.replace(tmp, QUOTA_STATE)
+
+    def limit(self, api: str) -> int:
+        return int(self._limits.get(api, INITIAL_CONCURRENCY))
+
+    def take(self, api: str, units: float) -> float:
+        """Charge units to the bucket; returns 0 if granted, else seconds to wait."""
+        with self._mutex:
+            successes = self._successes.pop(api, 0)
+
+        with self._locked() as state:
+            bucket = state.setdefault(api, _default_state(api))
+            now = time.time()
+
+            # Additive increase: +1 per `limit` successful calls since the last take
+            bucket["limit"] = min(MAX_CONCURRENCY, bucket["limit"] + successes / bucket["limit"])
+            self._limits[api] = bucket["limit"]
+
+            if now < bucket["throttled_until"]:
+                return bucket["throttled_until"] - now
+
+            rate = BUCKETS[api]["rate"]
+            capacity = BUCKETS[api]["capacity"]
+            bucket["tokens"] = min(capacity, bucket["tokens"] + (now - bucket["updated"]) * rate)
+            bucket["updated"] = now
+
+            units = min(units, capacity)
+            if bucket["tokens"] >= units:
+                bucket["tokens"] -= units
+                return 0.0
+            return (units - bucket["tokens"]) / rate
+
+    def success(self, api: str) -> None:
+        with self._mutex:
+            self._successes[api] = self._successes.get(api, 0) + 1
+
+    def throttled(self, api: str, delay: float) -> None:
+        """Multiplicative decrease, and hold every process back for delay seconds."""
+        with self._locked() as state:
+            bucket = state.setdefault(api, _default_state(api))
+            bucket["limit"] = max(1.0, bucket["limit"] / 2)
+            bucket["throttled_until"] = max(bucket["throttled_until"], time.time() + delay)
+            self._limits[api] = bucket["limit"]
+
+
+class ConcurrencyLimiter:
+    """In-process cap on in-flight requests per API, following the AIMD limit."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._in_flight = {}
+
+    @contextmanager
+    def slot(self, api: str, limit):
+        with self._cond:
+            while self._in_flight.get(api, 0) >= limit():
+                self._cond.wait(0.1)
+            self._in_flight[api] = self._in_flight.get(api, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight[api] -= 1
+                self._cond.notify_all()
+
+
+_quota = QuotaState()
+_limiter = ConcurrencyLimiter()
+
+
+def is_rate_limited(e: HttpError) -> bool:
+    if e.resp.status == 429:
+        return True
+    if e.resp.status != 403:
+        return False
+    try:
+        errors = json.loads(e.content).get("error", {}).get("errors", [])
+    except (ValueError, AttributeError):
+        return False
+    return any(err.get("reason") in RATE_LIMIT_REASONS for err in errors)
+
+
+def retry_delay(e: HttpError, attempt: int) -> float:
+    """Retry-After if the server sent one, else full-jitter exponential backoff."""
+    retry_after = e.resp.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def execute(request, api: str | None = None, units: float | None = None, idempotent: bool = True):
+    """Execute a googleapiclient request (or batch) under the shared quota.
+
+    api and units are derived from the request's methodId; pass them for
+    batch requests, e.g. execute(batch, api="gmail", units=5 * len(ids)).
+    Non-idempotent requests (send, insert) are retried only on rate-limit
+    responses, which Google rejects before acting, never on 5xx.
+    """
+    method = getattr(request, "methodId", "") or ""
+    api = api or method.split(".")[0]
+    if units is None:
+        units = QUOTA_UNITS.get(method, DEFAULT_UNITS[api])
+    return call_with_quota(request.execute, api, units, idempotent)
+
+
+def call_with_quota(func, api: str, units: float, idempotent: bool = True):
+    """Run func() under the shared quota, with execute()'s retry policy.
+
+    For Google API calls made outside googleapiclient (e.g. streaming
+    downloads): func must raise HttpError for error responses.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        while (wait := _quota.take(api, units)) > 0:
+            time.sleep(wait)
+
+        with _limiter.slot(api, lambda: _quota.limit(api)):
+            try:
+                result = func()
+            except HttpError as e:
+                rate_limited = is_rate_limited(e)
+                retryable = rate_limited or (idempotent and e.resp.status >= 500)
+                if attempt == MAX_RETRIES or not retryable:
+                    raise
+                delay = retry_delay(e, attempt)
+            else:
+                _quota.success(api)
+                return result
+
+        if rate_limited:
+            _quota.throttled(api, delay)
+        time.sleep(delay)
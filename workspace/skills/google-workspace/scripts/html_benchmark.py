@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""HTML-to-text benchmark — gmail.html_to_text vs the legacy HTMLParser extractor.
+
+Builds a synthetic corpus shaped like real mail (table-heavy marketing
+templates with hidden preheaders, long newsletters, quoted reply chains)
+and reports, per document, the median conversion time and output size of:
+- legacy:   the HTMLParser-based extractor gmail.py used before
+- new:      gmail.html_to_text() with no budget
+- budgeted: gmail.html_to_text() with the default read budget
+
+It also checks html_to_text() against malformed-markup cases (missing
+</head>, self-closing <svg/>, ">" inside quoted attributes) and exits
+non-zero if any produce the wrong text.
+
+Usage:
+    python3 html_benchmark.py
+    python3 html_benchmark.py '{"runs": 20, "scale": 2}'
+"""
+
+import json
+import statistics
+import sys
+import time
+from html.parser import HTMLParser
+
+# Allow importing gmail from same directory
+sys.path.insert(0, sys.path[0])
+from gmail import DEFAULT_BODY_MAX_CHARS, html_to_text
+
+
+class HTMLTextExtractor(HTMLParser):
+    """Simple HTML to plain text converter (gmail.py's original engine)."""
+
+    def __init__(self):
+        super().__init__()
+        self._text = []
+        self._skip = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip = True
+        elif tag == "br":
+            self._text.append("\n")
+        elif tag in ("p", "div", "tr", "li"):
+            self._text.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = False
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._text.append(data)
+
+    def get_text(self):
+        return "".join(self._text).strip()
+
+
+def legacy_html_to_text(html: str) -> str:
+    extractor = HTMLTextExtractor()
+    extractor.feed(html)
+    return extractor.get_text()
+
+
+# =============================================================================
+# Synthetic Corpus
+# =============================================================================
+
+HEAD = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Offer</title>
+<style type="text/css">{css}</style></head>"""
+
+
+def marketing_email(products: int) -> str:
+    """Nested layout tables, inline styles, hidden preheader, tracking pixels."""
+    css = "\n".join(f".c{i} {{ padding: {i % 12}px; color: #{i:06x}; }}" for i in range(300))
+    rows = []
+    for i in range(products):
+        rows.append(f"""
+      <tr><td align="center" style="padding:0 24px;">
+        <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">
+          <tr>
+            <td class="c{i % 300}" width="50%" valign="top" style="font-family:Arial,sans-serif;">
+              <a href="https://example.com/p/{i}?utm_source=mail"><img src="https://img.example.com/{i}.jpg" width="260" alt="Product {i}"></a>
+            </td>
+            <td width="50%" valign="top" style="font-family:Arial,sans-serif; font-size:14px;">
+              <h3 style="margin:0;">Product {i} &mdash; limited edition</h3>
+              <p style="margin:8px 0;">Was <s>$ {i + 40}.00</s> now <b>$ {i + 20}.00</b>.&nbsp;&nbsp;Free shipping on orders over $50.</p>
+              <table cellpadding="0" cellspacing="0"><tr><td style="background:#000; border-radius:4px;">
+                <a href="https://example.com/buy/{i}" style="color:#fff; padding:10px 18px; display:inline-block;">Shop&nbsp;now</a>
+              </td></tr></table>
+            </td>
+          </tr>
+        </table>
+      </td></tr>""")
+    preheader = "Big savings inside " + "&zwnj;&nbsp;" * 150
+    return (
+        HEAD.format(css=css)
+        + '<body style="margin:0;"><div style="display:none; max-height:0; overflow:hidden; mso-hide:all;">'
+        + preheader
+        + '</div><center><table role="presentation" width="600" cellpadding="0" cellspacing="0">'
+        + "".join(rows)
+        + '</table></center><img src="https://t.example.com/open.gif" width="1" height="1">'
+        + '<p style="font-size:11px;">You received this because you subscribed. <a href="#">Unsubscribe</a></p>'
+        + "</body></html>"
+    )
+
+
+def newsletter(articles: int) -> str:
+    """Long-form prose with headings, lists and links."""
+    body = []
+    for i in range(articles):
+        para = " ".join(f"Sentence {j} of article {i} discusses the topic at length." for j in range(12))
+        body.append(
+            f"<h2>Article {i}</h2><p>{para}</p>"
+            f"<ul><li>Point one for {i}</li><li>Point two for {i}</li></ul>"
+            f'<p><a href="https://example.com/a/{i}">Read more</a></p>'
+        )
+    return HEAD.format(css="p { line-height: 1.5; }") + "<body>" + "".join(body) + "</body></html>"
+
+
+def reply_chain(depth: int) -> str:
+    """Nested blockquotes, as produced by long threads."""
+    html = "<div>Original message body with some details.</div>"
+    for i in range(depth):
+        html = (
+            f"<div dir=\"ltr\">Reply number {i}: thanks, see below.<br><br></div>"
+            f'<div class="gmail_quote"><div>On Mon, Person {i} wrote:</div>'
+            f'<blockquote class="gmail_quote" style="margin:0 0 0 .8ex;border-left:1px #ccc solid;padding-left:1ex">{html}</blockquote></div>'
+        )
+    return "<html><body>" + html + "</body></html>"
+
+
+def build_corpus(scale: int) -> dict:
+    return {
+        "marketing_small": marketing_email(20 * scale),
+        "marketing_large": marketing_email(400 * scale),
+        "newsletter": newsletter(150 * scale),
+        "reply_chain": reply_chain(40 * scale),
+    }
+
+
+# Malformed markup real mail contains, with the text html_to_text must keep
+EDGE_CASES = [
+    ("<html><head><meta charset=utf-8><body>Hello there</body></html>", "Hello there"),
+    ("<p>See chart</p><svg width=1 /><p>Important text</p>", "See chart\n\nImportant text"),
+    ('<a title="a > b" href="#">link</a>', "link"),
+    ("<html><head><title>Subject</title></head><body><p>Body</p></body></html>", "Body"),
+    ("<p>Before</p><script>unclosed", "Before\n\nunclosed"),
+]
+
+
+def check_edge_cases() -> list:
+    """Failures as {"html", "expected", "got"}; empty when all pass."""
+    failures = []
+    for html, expected in EDGE_CASES:
+        got = html_to_text(html)
+        if got != expected:
+            failures.append({"html": html, "expected": expected, "got": got})
+    return failures
+
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+def median_ms(func, html: str, runs: int) -> tuple:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        text = func(html)
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 3), text
+
+
+def main():
+    args = {}
+    if len(sys.argv) >= 2:
+        args = json.loads(sys.argv[1])
+    runs = args.get("runs", 10)
+    scale = args.get("scale", 1)
+
+    engines = {
+        "legacy": legacy_html_to_text,
+        "new": html_to_text,
+        "budgeted": lambda html: html_to_text(html, DEFAULT_BODY_MAX_CHARS),
+    }
+
+    results = {}
+    for name, html in build_corpus(scale).items():
+        row = {"html_bytes": len(html.encode())}
+        for engine, func in engines.items():
+            ms, text = median_ms(func, html, runs)
+            row[engine] = {"median_ms": ms, "chars": len(text), "lines": text.count("\n") + 1}
+        row["speedup"] = round(row["legacy"]["median_ms"] / max(row["new"]["median_ms"], 1e-6), 2)
+        results[name] = row
+
+    failures = check_edge_cases()
+    print(json.dumps({"runs": runs, "scale": scale, "results": results,
+                      "edge_cases": {"checked": len(EDGE_CASES), "failures": failures}}, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+MCP Transport Benchmark - Measure mcp_client.py overhead per transport.
+
+Starts stub_server.py locally over each transport and times every stage
+separately:
+- setup:       create_session() (spawn/connect + initialize)
+- list_tools:  session.list_tools()
+- call_small:  call_tool("echo") with a short string
+- call_large:  call_tool("blob") returning --large-bytes of text
+- cli:         end-to-end `mcp_client.py call` wall time (direct mode)
+- cli_daemon:  the same call forwarded through a running daemon
+- cli_cached:  the same call answered from the result cache
+
+Output is JSON. With --baseline, each stage's p50 is compared against the
+stored baseline and regressions beyond --tolerance are flagged (exit 1).
+
+Usage:
+    python benchmark.py                                    # all transports
+    python benchmark.py --transports stdio sse -n 20
+    python benchmark.py --save-baseline bench-baseline.json
+    python benchmark.py --baseline bench-baseline.json --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+STUB_SERVER = SCRIPT_DIR / "stub_server.py"
+MCP_CLIENT = SCRIPT_DIR / "mcp_client.py"
+
+# Keep benchmark state (breaker, caches, metrics) out of the user's state dir
+BENCH_HOME = tempfile.mkdtemp(prefix="mcp-bench-")
+os.environ["MCP_CLIENT_HOME"] = BENCH_HOME
+
+sys.path.insert(0, str(SCRIPT_DIR))
+from mcp_client import create_session, percentile  # noqa: E402
+
+TRANSPORTS = ["stdio", "sse", "streamable_http", "fastmcp"]
+
+
+# =============================================================================
+# Stub Server Management
+# =============================================================================
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Stub server did not listen on port {port}")
+
+
+def start_stub(transport: str) -> tuple[dict, "subprocess.Popen | None"]:
+    """Start the stub server for a transport; returns (server config, process)."""
+    if transport == "stdio":
+        return {"command": sys.executable, "args": [str(STUB_SERVER)]}, None
+
+    port = free_port()
+    server_transport = "sse" if transport == "sse" else "streamable-http"
+    proc = subprocess.Popen(
+        [sys.executable, str(STUB_SERVER), "--transport", server_transport, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(port)
+
+    if transport == "sse":
+        return {"type": "sse", "url": f"http://127.0.0.1:{port}/sse"}, proc
+    if transport == "streamable_http":
+        return {"type": "http", "url": f"http://127.0.0.1:{port}/mcp"}, proc
+    # The stub ignores auth; the key only selects the FastMCP client path
+    return {"url": f"http://127.0.0.1:{port}/mcp", "api_key": "bench"}, proc
+
+
+# =============================================================================
+# Measurements
+# =============================================================================
+
+async def bench_session(name: str, config: dict, iterations: int, large_bytes: int) -> dict:
+    """Time setup, list_tools and small/large calls over fresh sessions."""
+    samples: dict[str, list[float]] = {
+        "setup": [], "list_tools": [], "call_small": [], "call_large": [],
+    }
+    for _ in range(iterations):
+        started = time.perf_counter()
+        async with create_session(config, name) as session:
+            samples["setup"].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await session.list_tools()
+            samples["list_tools"].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await session.call_tool("echo", {"text": "ping"})
+            samples["call_small"].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await session.call_tool("blob", {"size": large_bytes})
+            samples["call_large"].append(time.perf_counter() - started)
+    return samples
+
+
+def run_cli(args: list[str], env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(MCP_CLIENT), *args],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+    )
+    return time.perf_counter() - started
+
+
+def bench_cli(name: str, config: dict, iterations: int) -> dict:
+    """Time end-to-end CLI calls directly, through the daemon and from cache."""
+    call = ["call", name, "echo", '{"text": "ping"}']
+    direct_env = {
+        **os.environ,
+        "MCP_CONFIG": json.dumps({"mcpServers": {name: config}}),
+        "MCP_NO_DAEMON": "1",
+    }
+    daemon_env = {k: v for k, v in direct_env.items() if k != "MCP_NO_DAEMON"}
+    cached_env = {
+        **direct_env,
+        "MCP_CONFIG": json.dumps({"mcpServers": {name: {**config, "cache": {"echo": 3600}}}}),
+    }
+
+    samples = {"cli": [run_cli(call, direct_env) for _ in range(iterations)]}
+
+    subprocess.run(
+        [sys.executable, str(MCP_CLIENT), "daemon", "start"],
+        env=daemon_env, stdout=subprocess.DEVNULL, check=True,
+    )
+    try:
+        run_cli(call, daemon_env)  # warm the pool
+        samples["cli_daemon"] = [run_cli(call, daemon_env) for _ in range(iterations)]
+    finally:
+        subprocess.run(
+            [sys.executable, str(MCP_CLIENT), "daemon", "stop"],
+            env=daemon_env, stdout=subprocess.DEVNULL,
+        )
+
+    run_cli(call, cached_env)  # populate the cache
+    samples["cli_cached"] = [run_cli(call, cached_env) for _ in range(iterations)]
+    return samples
+
+
+def summarize(samples: dict[str, list[float]]) -> dict:
+    summary = {}
+    for stage, values in samples.items():
+        ms = sorted(v * 1000 for v in values)
+        summary[stage] = {
+            "n": len(ms),
+            "p50_ms": round(percentile(ms, 50), 2),
+            "p95_ms": round(percentile(ms, 95), 2),
+            "mean_ms": round(sum(ms) / len(ms), 2),
+            "min_ms": round(ms[0], 2),
+        }
+    return summary
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Compare p50s against a baseline; ratio > 1 + tolerance is a regression."""
+    rows = []
+    for transport, stages in results.items():
+        for stage, stats in stages.items():
+            base = baseline.get("results", {}).get(transport, {}).get(stage)
+            if not base or not base.get("p50_ms"):
+                continue
+            ratio = stats["p50_ms"] / base["p50_ms"]
+            status = "ok"
+            if ratio > 1 + tolerance:
+                status = "regression"
+            elif ratio < 1 - tolerance:
+                status = "improved"
+            rows.append({
+                "transport": transport,
+                "stage": stage,
+                "baseline_p50_ms": base["p50_ms"],
+                "p50_ms": stats["p50_ms"],
+                "ratio": round(ratio, 3),
+                "status": status,
+            })
+    return rows
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+async def run(args) -> dict:
+    results = {}
+    skipped = {}
+    for transport in args.transports:
+        if transport == "fastmcp":
+            try:
+                import fastmcp  # noqa: F401
+            except ImportError:
+                skipped[transport] = "fastmcp not installed"
+                continue
+
+        config, proc = start_stub(transport)
+        name = f"stub-{transport}"
+        try:
+            samples = await bench_session(name, config, args.iterations, args.large_bytes)
+            if not args.skip_cli:
+                samples.update(bench_cli(name, config, args.iterations))
+            results[transport] = summarize(samples)
+        finally:
+            if proc:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    try:
+        from importlib.metadata import version
+        mcp_version = version("mcp")
+    except Exception:
+        mcp_version = None
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mcp": mcp_version,
+            "iterations": args.iterations,
+            "large_bytes": args.large_bytes,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mcp_client.py per transport")
+    parser.add_argument("--transports", nargs="+", default=TRANSPORTS, choices=TRANSPORTS)
+    parser.add_argument("-n", "--iterations", type=int, default=10)
+    parser.add_argument("--large-bytes", type=int, default=1024 * 1024)
+    parser.add_argument("--skip-cli", action="store_true", help="Skip end-to-end CLI stages")
+    parser.add_argument("--baseline", type=Path, help="Compare against this baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown ratio")
+    parser.add_argument("--save-baseline", type=Path, help="Write results as the new baseline")
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        shutil.rmtree(BENCH_HOME, ignore_errors=True)
+
+    regressions = []
+    if args.baseline:
+        report["comparison"] = compare(report["results"], json.loads(args.baseline.read_text()), args.tolerance)
+        regressions = [row for row in report["comparison"] if row["status"] == "regression"]
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2) + "\n")
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
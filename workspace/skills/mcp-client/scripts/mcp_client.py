@@ -17,20 +17,99 @@ Config Resolution (priority order):
 Usage:
     python mcp_client.py servers                           # List configured servers
     python mcp_client.py tools <server>                    # List tools with schemas
+    python mcp_client.py tools --all                       # List tools from every server
     python mcp_client.py call <server> <tool> '{"args"}'   # Execute a tool
+    python mcp_client.py find <query>                      # Search tools offline
+    python mcp_client.py batch [file]                      # Run JSONL tool calls concurrently
+    python mcp_client.py stats [server]                    # Latency percentiles per phase
+    python mcp_client.py daemon start|stop|status|run      # Manage the session daemon
+
+Daemon mode (opt-in):
+    `daemon start` launches a background process that keeps warm sessions and
+    listens on a Unix socket. While it runs, `tools` and `call` are forwarded
+    to it instead of spawning/connecting to the server every time. When no
+    daemon is listening the CLI connects directly, exactly as before.
 
 Environment:
     MCP_CONFIG_PATH: Path to MCP config file
     MCP_CONFIG: Inline JSON config (for simple setups)
+    MCP_CLIENT_HOME: State directory for the daemon socket (default ~/.cache/mcp-client)
+    MCP_NO_DAEMON: Set to bypass the daemon and always connect directly
+    MCP_SCHEMA_TTL: Seconds a cached `tools` listing stays valid (default 86400, 0 disables)
+    MCP_RESULT_CACHE_MAX_BYTES: Disk bound for cached read-only tool results (default 50 MB)
+    MCP_METRICS_FILE: Where phase timings are appended (default $MCP_CLIENT_HOME/metrics.jsonl)
+    MCP_METRICS: Set to 0 to disable timing collection
+    MCP_HTTP_POOL_SIZE: Max pooled request connections per remote host (default 10;
+                        open event streams are not counted)
+    MCP_HTTP2: Set to 1 to negotiate HTTP/2 on pooled connections (needs `h2`)
 """
 
 import asyncio
+import base64
+import fcntl
+import hashlib
+import inspect
 import json
+import math
+import mimetypes
 import os
+import re
+import signal
+import subprocess
 import sys
+import tempfile
+import time
 from pathlib import Path
 from typing import Any, Optional
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager, nullcontext
+
+
+STATE_DIR = Path(os.environ.get("MCP_CLIENT_HOME", "~/.cache/mcp-client")).expanduser()
+DAEMON_SOCKET = STATE_DIR / "daemon.sock"
+DAEMON_LOG = STATE_DIR / "daemon.log"
+SCHEMA_CACHE_DIR = STATE_DIR / "schemas"
+CONFIG_CACHE = STATE_DIR / "config-cache.json"
+SPILL_DIR = STATE_DIR / "spill"
+RESULT_CACHE_DIR = STATE_DIR / "results"
+TOOL_INDEX = STATE_DIR / "tool-index.json"
+HEALTH_FILE = STATE_DIR / "health.json"
+METRICS_FILE = Path(os.environ.get("MCP_METRICS_FILE", STATE_DIR / "metrics.jsonl")).expanduser()
+
+# Text content larger than this (bytes) is written to a spill file when streaming
+DEFAULT_SPILL_THRESHOLD = 64 * 1024
+SPILL_MAX_AGE = 24 * 3600
+DEFAULT_RESULT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+METRICS_MAX_BYTES = 20 * 1024 * 1024
+
+# Connect/initialize deadline when a server sets neither *_timeout nor timeout
+DEFAULT_PHASE_TIMEOUT = 30
+
+DEFAULT_HTTP_POOL_SIZE = 10
+HTTP_KEEPALIVE_EXPIRY = 60
+
+# Config files at least this large (e.g. ~/.claude.json) go through the cache
+CONFIG_CACHE_MIN_BYTES = 64 * 1024
+
+DEFAULT_SCHEMA_TTL = 24 * 3600
+
+# Replies can carry large tool results on a single line
+DAEMON_LINE_LIMIT = 64 * 1024 * 1024
+
+# Seconds to wait for the daemon to accept a connection and acknowledge a
+# request before falling back to a direct session. Only the acknowledgement
+# is bounded: the reply itself may legitimately take as long as the tool.
+DAEMON_CONNECT_TIMEOUT = 2
+DAEMON_ACCEPT_TIMEOUT = 5
+
+# Shell bookkeeping variables left out of the environment forwarded to the
+# daemon, so commands run from different directories share warm sessions
+DAEMON_ENV_IGNORE = {"PWD", "OLDPWD", "SHLVL", "_"}
+
+
+def ensure_state_dir() -> Path:
+    """Create the private state directory if needed."""
+    STATE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return STATE_DIR
 
 
 # =============================================================================
@@ -82,13 +161,69 @@ def load_config() -> dict:
             "or create .mcp.json in the current directory."
         )
 
-    with open(config_path) as f:
+    return load_config_file(config_path)
+
+
+def parse_config_file(path: Path) -> dict:
+    """Extract the server map from a config file.
+
+    With ijson installed, only the top-level `mcpServers` value is built in
+    memory; the rest of the document (e.g. ~/.claude.json history) is
+    streamed past. Without it, falls back to loading the whole file.
+    """
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+
+    if ijson is not None:
+        try:
+            with open(path, "rb") as f:
+                for servers in ijson.items(f, "mcpServers", use_float=True):
+                    return servers
+        except ijson.JSONError as e:
+            raise ValueError(f"Invalid JSON in {path}: {e}")
+
+    with open(path) as f:
         config = json.load(f)
 
     # Handle both formats: {"mcpServers": {...}} and direct {...}
     return config.get("mcpServers", config)
 
 
+def load_config_file(path: Path) -> dict:
+    """Load the server map, reusing the compiled cache for large files.
+
+    Cache entries are keyed by source path, mtime and size, so any edit to
+    the source triggers a re-parse.
+    """
+    stat = path.stat()
+    if stat.st_size < CONFIG_CACHE_MIN_BYTES:
+        return parse_config_file(path)
+
+    source = str(path.resolve())
+    try:
+        entries = json.loads(CONFIG_CACHE.read_text())
+    except (OSError, ValueError):
+        entries = {}
+
+    entry = entries.get(source)
+    if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+        return entry["servers"]
+
+    servers = parse_config_file(path)
+    entries[source] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "servers": servers}
+
+    # Holds API keys from the source config, so keep it private
+    ensure_state_dir()
+    tmp = CONFIG_CACHE.with_suffix(f".{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(entries, f, default=str)
+    os.replace(tmp, CONFIG_CACHE)
+    return servers
+
+
 def get_server_config(servers: dict, server_name: str) -> dict:
     """Get configuration for a specific server."""
     if server_name not in servers:
@@ -97,6 +232,346 @@ def get_server_config(servers: dict, server_name: str) -> dict:
     return servers[server_name]
 
 
+def config_hash(config: dict) -> str:
+    """Stable short hash of a server config entry."""
+    blob = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+def metrics_enabled() -> bool:
+    return os.environ.get("MCP_METRICS", "1").lower() not in ("0", "false", "no")
+
+
+def record_metric(server: str, transport: str, phase: str, seconds: float, ok: bool = True) -> None:
+    """Append one phase timing to the JSONL metrics file."""
+    if not metrics_enabled():
+        return
+    line = json.dumps({
+        "ts": round(time.time(), 3),
+        "server": server,
+        "transport": transport,
+        "phase": phase,
+        "ms": round(seconds * 1000, 2),
+        "ok": ok,
+    })
+    try:
+        ensure_state_dir()
+        # Keep one rotated generation so the file can't grow without bound
+        if METRICS_FILE.exists() and METRICS_FILE.stat().st_size > METRICS_MAX_BYTES:
+            os.replace(METRICS_FILE, METRICS_FILE.with_suffix(".jsonl.1"))
+        with open(METRICS_FILE, "a") as f:
+            f.write(line + "\n")
+    except OSError:
+        # Metrics must never break a command
+        pass
+
+
+@contextmanager
+def timed(server: str, transport: str, phase: str):
+    """Time the enclosed block with a monotonic clock and record it."""
+    started = time.monotonic()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record_metric(server, transport, phase, time.monotonic() - started, ok)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def cmd_stats(server_name: Optional[str] = None, since: Optional[float] = None) -> list[dict]:
+    """Summarize recorded phase timings per server and phase."""
+    samples: dict[tuple[str, str, str], list[float]] = {}
+    errors: dict[tuple[str, str, str], int] = {}
+    cutoff = time.time() - since if since else 0
+
+    for path in (METRICS_FILE.with_suffix(".jsonl.1"), METRICS_FILE):
+        try:
+            f = open(path)
+        except OSError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if server_name and entry.get("server") != server_name:
+                    continue
+                if entry.get("ts", 0) < cutoff:
+                    continue
+                key = (entry.get("server", ""), entry.get("transport", ""), entry.get("phase", ""))
+                samples.setdefault(key, []).append(entry.get("ms", 0.0))
+                if not entry.get("ok", True):
+                    errors[key] = errors.get(key, 0) + 1
+
+    stats = []
+    for (server, transport, phase), values in sorted(samples.items()):
+        values.sort()
+        stats.append({
+            "server": server,
+            "transport": transport,
+            "phase": phase,
+            "count": len(values),
+            "errors": errors.get((server, transport, phase), 0),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+        })
+    return stats
+
+
+# =============================================================================
+# Circuit Breaker & Hedging
+# =============================================================================
+
+class CircuitOpenError(ConnectionError):
+    """Raised without connecting while a server's breaker is open."""
+
+
+class CircuitBreaker:
+    """Per-server connection health, persisted across invocations.
+
+    After `failures` consecutive connect/initialize failures the breaker
+    opens and sessions fail fast. Once `reset_after` seconds pass, a single
+    half-open probe is let through: success closes the breaker, failure
+    re-opens it. Configure per server with
+    {"breaker": {"failures": 3, "reset_after": 30}} or disable with
+    {"breaker": false}.
+    """
+
+    def __init__(self, name: str, config: dict):
+        self.name = name
+        settings = config.get("breaker", {})
+        self.enabled = settings is not False
+        settings = settings if isinstance(settings, dict) else {}
+        self.threshold = int(settings.get("failures", 3))
+        self.reset_after = float(settings.get("reset_after", 30))
+        # A probe that hasn't reported back within this window is presumed dead
+        self.probe_window = 2 * float(config.get("timeout", DEFAULT_PHASE_TIMEOUT))
+
+    @contextmanager
+    def _state(self):
+        """Lock the health file and yield this server's mutable entry."""
+        ensure_state_dir()
+        with open(HEALTH_FILE.with_suffix(".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                health = json.loads(HEALTH_FILE.read_text())
+            except (OSError, ValueError):
+                health = {}
+            entry = health.setdefault(self.name, {"state": "closed", "failures": 0})
+            before = dict(entry)
+            yield entry
+            if entry != before:
+                tmp = HEALTH_FILE.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(health))
+                os.replace(tmp, HEALTH_FILE)
+
+    def admit(self) -> None:
+        """Raise CircuitOpenError unless a connection attempt may proceed."""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._state() as entry:
+            if entry["state"] == "closed":
+                return
+            if entry["state"] == "open" and now - entry.get("opened_at", 0) >= self.reset_after:
+                entry.update(state="half_open", probe_at=now)
+                return
+            if entry["state"] == "half_open" and now - entry.get("probe_at", 0) >= self.probe_window:
+                entry["probe_at"] = now
+                return
+            if entry["state"] == "half_open":
+                # A probe is in flight; another is allowed once it is presumed dead
+                retry_in = entry.get("probe_at", now) + self.probe_window - now
+            else:
+                retry_in = self.reset_after - (now - entry.get("opened_at", now))
+            retry_in = max(0.0, retry_in)
+        raise CircuitOpenError(
+            f"Circuit open for '{self.name}' after {entry['failures']} failures; "
+            f"next probe in {retry_in:.0f}s"
+        )
+
+    def record(self, ok: bool) -> None:
+        """Update health after a connect/initialize attempt."""
+        if not self.enabled:
+            return
+        with self._state() as entry:
+            if ok:
+                entry.clear()
+                entry.update(state="closed", failures=0)
+                return
+            entry["failures"] = entry.get("failures", 0) + 1
+            if entry["state"] == "half_open" or entry["failures"] >= self.threshold:
+                entry.pop("probe_at", None)
+                entry.update(state="open", opened_at=time.time())
+
+
+def hedge_policy(config: dict, tool_name: str) -> Optional[tuple[float, int]]:
+    """(delay, max_attempts) if the tool is listed as idempotent under `hedge`.
+
+    Example: {"hedge": {"tools": ["search"], "delay": 2.0, "max_attempts": 2}}
+    """
+    hedge = config.get("hedge")
+    if not isinstance(hedge, dict) or tool_name not in hedge.get("tools", []):
+        return None
+    return float(hedge.get("delay", 2.0)), max(1, int(hedge.get("max_attempts", 2)))
+
+
+async def hedged(attempt, delay: float, max_attempts: int) -> Any:
+    """Run `attempt()`, starting another if it is slow or fails.
+
+    A new attempt starts when none has finished within `delay` seconds, or
+    immediately after a retryable failure, up to `max_attempts` in total.
+    The first success wins and the others are cancelled. Validation errors
+    are not retried. A CircuitOpenError means the breaker refused another
+    attempt (e.g. while a half-open probe is in flight): hedging stops, but
+    attempts already running are still awaited, so a slow probe can finish
+    and close the breaker. It is raised only when nothing else is in flight.
+    """
+    pending: set[asyncio.Task] = set()
+    launched = 0
+    last_error: Optional[BaseException] = None
+    circuit_refused = False
+
+    def launch():
+        nonlocal launched
+        pending.add(asyncio.create_task(attempt()))
+        launched += 1
+
+    launch()
+    try:
+        while pending:
+            can_hedge = launched < max_attempts and not circuit_refused
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                launch()
+                continue
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+                if isinstance(error, ValueError):
+                    raise error
+                if isinstance(error, CircuitOpenError):
+                    circuit_refused = True
+                    # Keep an earlier real failure as the reason if there is one
+                    last_error = last_error or error
+                    continue
+                last_error = error
+            if launched < max_attempts and not circuit_refused:
+                launch()
+        raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+# =============================================================================
+# HTTP Connection Pool
+# =============================================================================
+
+# One keep-alive pool per (scheme, host, port), shared by every remote session
+# in the process (batch runs, the daemon, tools --all). Long-lived event
+# streams (the GET that SSE and streamable-HTTP sessions hold open) get their
+# own uncapped pool per origin, so ten sessions on one host can't use up the
+# request pool's connections and starve every POST.
+_HTTP_POOLS: dict[tuple[str, str, int, bool], Any] = {}
+
+
+def is_event_stream(request) -> bool:
+    return request.method == "GET" and "text/event-stream" in request.headers.get("accept", "")
+
+
+def http_pool_for(url, stream: bool = False) -> Any:
+    """Return the process-wide httpx transport for a URL's origin."""
+    import httpx
+
+    key = (url.scheme, url.host, url.port or (443 if url.scheme == "https" else 80), stream)
+    if key not in _HTTP_POOLS:
+        size = int(os.environ.get("MCP_HTTP_POOL_SIZE", DEFAULT_HTTP_POOL_SIZE))
+        http2 = os.environ.get("MCP_HTTP2", "").lower() in ("1", "true", "yes")
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                http2 = False
+        _HTTP_POOLS[key] = httpx.AsyncHTTPTransport(
+            http2=http2 and not stream,
+            limits=httpx.Limits(
+                max_connections=None if stream else size,
+                max_keepalive_connections=size,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _HTTP_POOLS[key]
+
+
+def pooled_http_client(headers=None, timeout=None, auth=None, **kwargs):
+    """httpx client factory for the MCP/FastMCP transports.
+
+    Clients are cheap per-session wrappers (headers, auth, timeouts) around
+    the shared pools. Closing one leaves the pooled connections open.
+    Redirects are followed, as the SDK's own factory does (e.g. /mcp -> /mcp/).
+    """
+    import httpx
+
+    class SharedPoolTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            pool = http_pool_for(request.url, stream=is_event_stream(request))
+            return await pool.handle_async_request(request)
+
+        async def aclose(self):
+            pass
+
+    if timeout is None:
+        timeout = httpx.Timeout(30, read=300)
+    kwargs.setdefault("follow_redirects", True)
+    return httpx.AsyncClient(
+        headers=headers, timeout=timeout, auth=auth, transport=SharedPoolTransport(), **kwargs
+    )
+
+
+def http_client_options(transport_factory, config: dict) -> dict:
+    """Keyword args that route a remote transport through the shared pool.
+
+    Empty when the server opts out with {"http_pool": false} or the installed
+    SDK predates `httpx_client_factory`.
+    """
+    if config.get("http_pool") is False:
+        return {}
+    try:
+        params = inspect.signature(transport_factory).parameters
+    except (TypeError, ValueError):
+        return {}
+    if "httpx_client_factory" not in params:
+        return {}
+    return {"httpx_client_factory": pooled_http_client}
+
+
+async def close_http_pools() -> None:
+    """Close all pooled connections (end of process or daemon shutdown)."""
+    pools = list(_HTTP_POOLS.values())
+    _HTTP_POOLS.clear()
+    for pool in pools:
+        await pool.aclose()
+
+
 # =============================================================================
 # Transport Detection & Connection
 # =============================================================================
@@ -135,10 +610,22 @@ def detect_transport(config: dict) -> str:
     raise ValueError("Cannot detect transport: config must have 'command' or 'url'")
 
 
-@asynccontextmanager
-async def create_session(config: dict):
-    """Create MCP client session based on server config."""
-    transport = detect_transport(config)
+def deadline(seconds: Optional[float]):
+    """Timeout scope for a phase; no-op when unset or unsupported (< 3.11)."""
+    if not seconds or not hasattr(asyncio, "timeout"):
+        return nullcontext()
+    return asyncio.timeout(seconds)
+
+
+async def open_session(stack: AsyncExitStack, config: dict, name: str, transport: str,
+                       environ: Optional[dict] = None):
+    """Connect and initialize a session whose cleanup is owned by `stack`.
+
+    Connect and initialize are each bounded by `connect_timeout` and
+    `init_timeout` (default: the server's `timeout`, else 30s).
+    """
+    connect_timeout = config.get("connect_timeout", config.get("timeout", DEFAULT_PHASE_TIMEOUT))
+    init_timeout = config.get("init_timeout", config.get("timeout", DEFAULT_PHASE_TIMEOUT))
 
     if transport == "fastmcp":
         # FastMCP client with Bearer auth (Zapier, etc.)
@@ -150,20 +637,27 @@ async def create_session(config: dict):
 
         transport_obj = StreamableHttpTransport(
             url,
-            headers={"Authorization": f"Bearer {api_key}"}
+            headers={"Authorization": f"Bearer {api_key}"},
+            **http_client_options(StreamableHttpTransport, config),
         )
         client = Client(transport=transport_obj)
 
-        async with client:
-            # Wrap FastMCP client in adapter for unified interface
-            yield FastMCPSessionAdapter(client)
+        # Entering the FastMCP client connects and initializes in one step
+        with timed(name, transport, "connect"):
+            async with deadline(connect_timeout + init_timeout):
+                await stack.enter_async_context(client)
+
+        # Wrap FastMCP client in adapter for unified interface
+        return FastMCPSessionAdapter(client)
+
+    from mcp import ClientSession
 
-    elif transport == "stdio":
-        from mcp import ClientSession, StdioServerParameters
+    if transport == "stdio":
+        from mcp import StdioServerParameters
         from mcp.client.stdio import stdio_client
 
-        # Build environment with current env + config env
-        env = {**os.environ}
+        # Build environment with current (or forwarded caller) env + config env
+        env = {**(os.environ if environ is None else environ)}
         if config_env := config.get("env"):
             env.update(config_env)
 
@@ -173,41 +667,75 @@ async def create_session(config: dict):
             env=env,
             cwd=config.get("cwd"),
         )
-
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                yield session
+        streams = stdio_client(server_params)
 
     elif transport == "sse":
-        from mcp import ClientSession
         from mcp.client.sse import sse_client
 
         url = config["url"]
         headers = config.get("headers")
         timeout = config.get("timeout", 30)
-
-        async with sse_client(url, headers=headers, timeout=timeout) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                yield session
+        streams = sse_client(
+            url, headers=headers, timeout=timeout, **http_client_options(sse_client, config)
+        )
 
     elif transport == "streamable_http":
-        from mcp import ClientSession
         from mcp.client.streamable_http import streamablehttp_client
 
         url = config["url"]
         headers = config.get("headers")
-        timeout = config.get("timeout", 30)
-
-        async with streamablehttp_client(url, headers=headers) as (read, write, _):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                yield session
+        streams = streamablehttp_client(
+            url, headers=headers, **http_client_options(streamablehttp_client, config)
+        )
 
     else:
         raise ValueError(f"Unsupported transport: {transport}")
 
+    with timed(name, transport, "connect"):
+        async with deadline(connect_timeout):
+            read, write, *_ = await stack.enter_async_context(streams)
+
+    session = await stack.enter_async_context(ClientSession(read, write))
+    with timed(name, transport, "initialize"):
+        async with deadline(init_timeout):
+            await session.initialize()
+    return session
+
+
+@asynccontextmanager
+async def create_session(config: dict, name: str = "", environ: Optional[dict] = None):
+    """Create MCP client session based on server config.
+
+    Connect and initialize times are recorded to the metrics file, labelled
+    with `name` and the transport. When `name` is given, the server's
+    circuit breaker is consulted first and updated with the outcome.
+    `environ` replaces os.environ as the base of a stdio server's environment.
+    """
+    transport = detect_transport(config)
+    breaker = CircuitBreaker(name, config) if name else None
+    if breaker:
+        breaker.admit()
+
+    failure: Optional[Exception] = None
+    async with AsyncExitStack() as stack:
+        try:
+            session = await open_session(stack, config, name, transport, environ)
+        except Exception as e:
+            failure = e
+        else:
+            if breaker:
+                breaker.record(True)
+            yield session
+            return
+
+    # Raised only once the transports have unwound; raising inside the stack
+    # would get wrapped in an ExceptionGroup by their anyio task groups
+    if breaker:
+        breaker.record(False)
+    if isinstance(failure, asyncio.TimeoutError):
+        raise ConnectionError(f"Timed out connecting to '{name or transport}'") from failure
+    raise failure
+
 
 class FastMCPSessionAdapter:
     """Adapter to give FastMCP Client a similar interface to mcp ClientSession."""
@@ -226,6 +754,633 @@ class FastMCPSessionAdapter:
         return result
 
 
+# =============================================================================
+# Schema Cache
+# =============================================================================
+
+def schema_ttl(config: dict) -> float:
+    """Schema cache lifetime: per-server `schema_ttl`, else MCP_SCHEMA_TTL."""
+    return float(config.get("schema_ttl", os.environ.get("MCP_SCHEMA_TTL", DEFAULT_SCHEMA_TTL)))
+
+
+def _cache_stem(server_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", server_name)
+
+
+def schema_cache_path(server_name: str, config: dict) -> Path:
+    """Cache file for a server, keyed by a hash of its config entry."""
+    return SCHEMA_CACHE_DIR / f"{_cache_stem(server_name)}-{config_hash(config)}.json"
+
+
+def read_schema_cache(server_name: str, config: dict) -> Optional[list[dict]]:
+    """Return cached tool schemas, or None if missing, expired or disabled."""
+    ttl = schema_ttl(config)
+    if ttl <= 0:
+        return None
+    try:
+        entry = json.loads(schema_cache_path(server_name, config).read_text())
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get("fetched_at", 0) > ttl:
+        return None
+    return entry.get("tools")
+
+
+def write_schema_cache(server_name: str, config: dict, tools: list[dict]) -> None:
+    """Store tool schemas and drop entries written for older configs."""
+    if schema_ttl(config) <= 0:
+        return
+    ensure_state_dir()
+    SCHEMA_CACHE_DIR.mkdir(mode=0o700, exist_ok=True)
+
+    path = schema_cache_path(server_name, config)
+    stem = _cache_stem(server_name)
+    for old in SCHEMA_CACHE_DIR.glob(f"{stem}-*.json"):
+        # Hash suffix is 16 hex chars; guard against servers sharing a prefix
+        if old != path and old.stem[:-17] == stem:
+            old.unlink(missing_ok=True)
+
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({
+        "server": server_name,
+        "config_hash": config_hash(config),
+        "fetched_at": time.time(),
+        "tools": tools,
+    }, default=str))
+    os.replace(tmp, path)
+
+
+# =============================================================================
+# Tool Search Index
+# =============================================================================
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens, splitting camelCase and snake_case identifiers."""
+    words = re.findall(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+", text or "")
+    tokens = []
+    for word in words:
+        word = word.lower()
+        # Crude plural folding so "issues" matches "issue"
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def index_document(tool: dict) -> dict:
+    """Precompute a tool's compact schema and term frequencies for BM25."""
+    schema = tool.get("parameters") or {}
+    properties = schema.get("properties") or {}
+
+    # Names matter more than prose, so they are counted several times
+    terms = tokenize(tool.get("name", "")) * 3
+    terms += tokenize(tool.get("description", ""))
+    for param in properties:
+        terms += tokenize(param)
+
+    tf: dict[str, int] = {}
+    for term in terms:
+        tf[term] = tf.get(term, 0) + 1
+
+    description = (tool.get("description") or "").strip().split("\n")[0]
+    return {
+        "name": tool.get("name", ""),
+        "description": description[:200],
+        "params": {
+            param: spec.get("type", "any") if isinstance(spec, dict) else "any"
+            for param, spec in properties.items()
+        },
+        "required": schema.get("required", []),
+        "tf": tf,
+        "length": len(terms),
+    }
+
+
+def load_tool_index() -> dict:
+    try:
+        return json.loads(TOOL_INDEX.read_text())
+    except (OSError, ValueError):
+        return {"servers": {}}
+
+
+def save_tool_index(index: dict) -> None:
+    ensure_state_dir()
+    tmp = TOOL_INDEX.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(index, default=str))
+    os.replace(tmp, TOOL_INDEX)
+
+
+def update_tool_index(server_name: str, config: dict, tools: list[dict]) -> None:
+    """Replace one server's documents in the index, leaving the rest alone."""
+    index = load_tool_index()
+    index["servers"][server_name] = {
+        "config_hash": config_hash(config),
+        "indexed_at": time.time(),
+        "docs": [index_document(tool) for tool in tools],
+    }
+    save_tool_index(index)
+
+
+def sync_tool_index(servers: dict) -> dict:
+    """Bring the index in line with the config, using cached schemas only.
+
+    Servers removed from the config are dropped; servers whose config changed
+    are re-indexed from the schema cache when a cache entry exists.
+    """
+    index = load_tool_index()
+    changed = False
+
+    for name in list(index["servers"]):
+        if name not in servers:
+            del index["servers"][name]
+            changed = True
+
+    for name, config in servers.items():
+        entry = index["servers"].get(name)
+        if entry and entry.get("config_hash") == config_hash(config):
+            continue
+        try:
+            cached = json.loads(schema_cache_path(name, config).read_text())
+        except (OSError, ValueError):
+            continue
+        index["servers"][name] = {
+            "config_hash": config_hash(config),
+            "indexed_at": cached.get("fetched_at", time.time()),
+            "docs": [index_document(tool) for tool in cached.get("tools", [])],
+        }
+        changed = True
+
+    if changed:
+        save_tool_index(index)
+    return index
+
+
+def search_tool_index(index: dict, servers: dict, query: str, limit: int = 5) -> list[dict]:
+    """Rank indexed tools against a query with BM25."""
+    k1, b = 1.2, 0.75
+    docs = [
+        (name, doc)
+        for name, entry in index["servers"].items()
+        if name in servers and entry.get("config_hash") == config_hash(servers[name])
+        for doc in entry["docs"]
+    ]
+    terms = set(tokenize(query))
+    if not docs or not terms:
+        return []
+
+    avg_length = sum(doc["length"] for _, doc in docs) / len(docs) or 1
+    doc_freq = {term: sum(1 for _, doc in docs if term in doc["tf"]) for term in terms}
+
+    scored = []
+    for server, doc in docs:
+        score = 0.0
+        for term in terms:
+            freq = doc["tf"].get(term)
+            if not freq:
+                continue
+            idf = math.log(1 + (len(docs) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            norm = freq + k1 * (1 - b + b * doc["length"] / avg_length)
+            score += idf * freq * (k1 + 1) / norm
+        if score > 0:
+            scored.append((score, server, doc))
+
+    scored.sort(key=lambda hit: hit[0], reverse=True)
+    return [
+        {
+            "server": server,
+            "tool": doc["name"],
+            "score": round(score, 3),
+            "description": doc["description"],
+            "params": doc["params"],
+            "required": doc["required"],
+        }
+        for score, server, doc in scored[:limit]
+    ]
+
+
+# =============================================================================
+# Result Cache
+# =============================================================================
+
+def result_cache_ttl(config: dict, tool_name: str) -> float:
+    """TTL for caching a tool's results; 0 unless the tool is allowlisted.
+
+    Only tools named in the server's `cache` block are cached, e.g.
+    {"cache": {"search": 300, "fetch": 600}}, so write tools never are.
+    """
+    try:
+        return max(0.0, float((config.get("cache") or {}).get(tool_name, 0)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def result_cache_path(server_name: str, tool_name: str, arguments: dict) -> Path:
+    """Cache file for a (server, tool, canonicalized arguments) triple."""
+    key = json.dumps([server_name, tool_name, arguments], sort_keys=True, separators=(",", ":"), default=str)
+    return RESULT_CACHE_DIR / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+
+def read_result_cache(server_name: str, tool_name: str, arguments: dict) -> tuple[bool, Any]:
+    """Return (hit, result). A hit refreshes the entry's LRU position."""
+    path = result_cache_path(server_name, tool_name, arguments)
+    try:
+        entry = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return False, None
+    if time.time() > entry.get("expires", 0):
+        path.unlink(missing_ok=True)
+        return False, None
+    os.utime(path)
+    return True, entry.get("result")
+
+
+def write_result_cache(server_name: str, tool_name: str, arguments: dict, result: Any, ttl: float) -> None:
+    """Store a result and evict least-recently-used entries over the size bound."""
+    ensure_state_dir()
+    RESULT_CACHE_DIR.mkdir(mode=0o700, exist_ok=True)
+
+    path = result_cache_path(server_name, tool_name, arguments)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({
+        "server": server_name,
+        "tool": tool_name,
+        "expires": time.time() + ttl,
+        "result": result,
+    }, default=str))
+    os.replace(tmp, path)
+
+    max_bytes = int(os.environ.get("MCP_RESULT_CACHE_MAX_BYTES", DEFAULT_RESULT_CACHE_MAX_BYTES))
+    entries = []
+    for cached in RESULT_CACHE_DIR.glob("*.json"):
+        try:
+            stat = cached.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, cached))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, cached in sorted(entries):
+        if total <= max_bytes:
+            break
+        cached.unlink(missing_ok=True)
+        total -= size
+
+
+# =============================================================================
+# Warm Sessions & Daemon
+# =============================================================================
+
+class WarmSession:
+    """Keeps one create_session() open in a background task until closed.
+
+    The MCP transports are anyio context managers that must be entered and
+    exited from the same task, so each warm session owns a task that holds
+    the context open and waits for close().
+    """
+
+    def __init__(self, config: dict, name: str = "", environ: Optional[dict] = None):
+        self.config = config
+        self.name = name
+        self.environ = environ
+        self.session = None
+        self.last_used = time.monotonic()
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> "WarmSession":
+        """Open the session, raising if the connection fails."""
+        self._task = asyncio.create_task(self._hold())
+        await self._ready.wait()
+        if self.session is None:
+            raise self._error or ConnectionError("Session closed during startup")
+        return self
+
+    async def _hold(self):
+        try:
+            async with create_session(self.config, self.name, self.environ) as session:
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def close(self):
+        """Tear the session down and wait for the transport to exit."""
+        self._closing.set()
+        if self._task:
+            await self._task
+
+
+class SessionPool:
+    """Warm sessions for one server, capped at max_sessions.
+
+    A session is leased to one request at a time. Requests beyond the cap
+    wait for a session to be returned rather than opening another one.
+    """
+
+    def __init__(self, config: dict, max_sessions: int = 1, name: str = "",
+                 environ: Optional[dict] = None):
+        self.config = config
+        self.name = name
+        self.environ = environ
+        self.max_sessions = max(1, max_sessions)
+        self.idle: list[WarmSession] = []
+        self.busy = 0
+        self._cond = asyncio.Condition()
+
+    @property
+    def size(self) -> int:
+        return len(self.idle) + self.busy
+
+    @asynccontextmanager
+    async def lease(self):
+        """Borrow a session, opening one if the pool is below its cap."""
+        async with self._cond:
+            while not self.idle and self.size >= self.max_sessions:
+                await self._cond.wait()
+            warm = self.idle.pop() if self.idle else None
+            self.busy += 1
+
+        try:
+            if warm is None:
+                warm = await WarmSession(self.config, self.name, self.environ).start()
+        except BaseException:
+            async with self._cond:
+                self.busy -= 1
+                self._cond.notify()
+            raise
+
+        healthy = False
+        try:
+            yield warm.session
+            healthy = True
+        finally:
+            warm.last_used = time.monotonic()
+            async with self._cond:
+                self.busy -= 1
+                # A transport error may have left the session broken; drop it
+                if healthy:
+                    self.idle.append(warm)
+                self._cond.notify()
+            if not healthy:
+                await warm.close()
+
+    async def evict_idle(self, max_idle: float) -> int:
+        """Close sessions unused for longer than max_idle seconds."""
+        now = time.monotonic()
+        async with self._cond:
+            stale = [w for w in self.idle if now - w.last_used > max_idle]
+            self.idle = [w for w in self.idle if w not in stale]
+        for warm in stale:
+            await warm.close()
+        return len(stale)
+
+    async def close(self):
+        async with self._cond:
+            idle, self.idle = self.idle, []
+        for warm in idle:
+            await warm.close()
+
+
+class McpDaemon:
+    """Serves tools/call requests over a Unix socket from warm session pools.
+
+    Requests and replies are one JSON object per line. Requests carry the
+    server's config entry, so pools are keyed by (server, config hash) and a
+    changed config simply gets a fresh pool.
+    """
+
+    def __init__(self, socket_path: Path, idle_timeout: float = 300, max_sessions: int = 1):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.pools: dict[tuple[str, str], SessionPool] = {}
+        self.started = time.time()
+        self._stop = asyncio.Event()
+
+    def pool_for(self, server: str, config: dict, environ: Optional[dict] = None) -> SessionPool:
+        key = (server, config_hash({"config": config, "environ": environ}))
+        if key not in self.pools:
+            self.pools[key] = SessionPool(config, self.max_sessions, server, environ)
+        return self.pools[key]
+
+    async def dispatch(self, request: dict) -> Any:
+        op = request.get("op")
+
+        if op == "tools":
+            pool = self.pool_for(request["server"], request["config"], request.get("environ"))
+            async with pool.lease() as session:
+                with timed(pool.name, detect_transport(pool.config), "list_tools"):
+                    return format_tools(await session.list_tools())
+
+        if op == "call":
+            pool = self.pool_for(request["server"], request["config"], request.get("environ"))
+            async with pool.lease() as session:
+                with timed(pool.name, detect_transport(pool.config), "call_tool"):
+                    result = await session.call_tool(request["tool"], request.get("arguments") or {})
+            return describe_result(result)
+
+        if op == "status":
+            now = time.monotonic()
+            return {
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.started, 1),
+                "idle_timeout": self.idle_timeout,
+                "max_sessions": self.max_sessions,
+                "pools": [
+                    {
+                        "server": server,
+                        "config_hash": config_hash(pool.config),
+                        "sessions": pool.size,
+                        "busy": pool.busy,
+                        "idle_seconds": [round(now - w.last_used, 1) for w in pool.idle],
+                    }
+                    for (server, _), pool in self.pools.items()
+                ],
+            }
+
+        if op == "shutdown":
+            self._stop.set()
+            return {"status": "stopping"}
+
+        raise ValueError(f"Unknown daemon op: {op}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                # Acknowledge first, so clients can tell a busy daemon from a wedged one
+                writer.write(b'{"accepted": true}\n')
+                await writer.drain()
+                try:
+                    reply = {"ok": True, "result": await self.dispatch(json.loads(line))}
+                except ValueError as e:
+                    reply = {"ok": False, "error": str(e), "type": "validation"}
+                except ConnectionError as e:
+                    reply = {"ok": False, "error": str(e), "type": "connection"}
+                except Exception as e:
+                    reply = {"ok": False, "error": str(e), "type": "error"}
+                writer.write(json.dumps(reply, default=str).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _evict_loop(self):
+        interval = max(1.0, min(30.0, self.idle_timeout / 2))
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            for key, pool in list(self.pools.items()):
+                await pool.evict_idle(self.idle_timeout)
+                if pool.size == 0:
+                    self.pools.pop(key, None)
+
+    async def serve(self):
+        ensure_state_dir()
+        if self.socket_path.exists():
+            if await daemon_request({"op": "status"}, self.socket_path) is not None:
+                raise RuntimeError(f"Daemon already running on {self.socket_path}")
+            self.socket_path.unlink()
+
+        server = await asyncio.start_unix_server(
+            self.handle, path=str(self.socket_path), limit=DAEMON_LINE_LIMIT
+        )
+        os.chmod(self.socket_path, 0o600)
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._stop.set)
+
+        evictor = asyncio.create_task(self._evict_loop())
+        try:
+            await self._stop.wait()
+        finally:
+            server.close()
+            await evictor
+            for pool in self.pools.values():
+                await pool.close()
+            await close_http_pools()
+            self.socket_path.unlink(missing_ok=True)
+
+
+async def daemon_request(request: dict, socket_path: Path = DAEMON_SOCKET) -> Optional[dict]:
+    """Send one request to the daemon.
+
+    Returns None if no daemon is listening, or if it doesn't accept the
+    connection and acknowledge the request in time (a wedged daemon), so
+    callers fall back to a direct session.
+    """
+    if not socket_path.exists():
+        return None
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_unix_connection(str(socket_path), limit=DAEMON_LINE_LIMIT),
+            timeout=DAEMON_CONNECT_TIMEOUT,
+        )
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+    try:
+        writer.write(json.dumps(request, default=str).encode("utf-8") + b"\n")
+        await writer.drain()
+        try:
+            line = await asyncio.wait_for(reader.readline(), timeout=DAEMON_ACCEPT_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None
+        if line and json.loads(line).get("accepted"):
+            line = await reader.readline()
+    finally:
+        writer.close()
+
+    if not line:
+        raise ConnectionError("Daemon closed the connection without replying")
+    return json.loads(line)
+
+
+def caller_environ() -> dict:
+    """The environment a direct stdio session would give the server."""
+    return {k: v for k, v in os.environ.items() if k not in DAEMON_ENV_IGNORE}
+
+
+async def forward_to_daemon(request: dict) -> Optional[dict]:
+    """Forward a tools/call request unless the daemon is disabled or not running.
+
+    stdio requests carry the caller's environment, so the daemon spawns the
+    server with it rather than with the environment the daemon started in.
+    """
+    if os.environ.get("MCP_NO_DAEMON"):
+        return None
+    if detect_transport(request["config"]) == "stdio":
+        request = {**request, "environ": caller_environ()}
+    return await daemon_request(request)
+
+
+def unwrap_daemon_reply(reply: dict) -> Any:
+    """Return a daemon result or re-raise its error as the matching exception."""
+    if reply.get("ok"):
+        return reply.get("result")
+    error_types = {"validation": ValueError, "connection": ConnectionError}
+    raise error_types.get(reply.get("type"), RuntimeError)(reply.get("error", "Daemon error"))
+
+
+async def cmd_daemon(action: str, options: dict) -> Any:
+    """Start, stop, inspect or run the session daemon."""
+    idle_timeout = float(options.get("idle-timeout", 300))
+    max_sessions = int(options.get("max-sessions", 1))
+
+    if action == "run":
+        await McpDaemon(DAEMON_SOCKET, idle_timeout, max_sessions).serve()
+        return {"status": "stopped"}
+
+    if action == "status":
+        reply = await daemon_request({"op": "status"})
+        if reply is None:
+            return {"running": False, "socket": str(DAEMON_SOCKET)}
+        return {"running": True, "socket": str(DAEMON_SOCKET), **unwrap_daemon_reply(reply)}
+
+    if action == "stop":
+        reply = await daemon_request({"op": "shutdown"})
+        return {"status": "stopping" if reply is not None else "not_running"}
+
+    if action == "start":
+        if await daemon_request({"op": "status"}) is not None:
+            return {"status": "already_running", "socket": str(DAEMON_SOCKET)}
+
+        ensure_state_dir()
+        with open(DAEMON_LOG, "ab") as log:
+            proc = subprocess.Popen(
+                [
+                    sys.executable, str(Path(__file__).resolve()), "daemon", "run",
+                    "--idle-timeout", str(idle_timeout),
+                    "--max-sessions", str(max_sessions),
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                start_new_session=True,
+            )
+
+        # Wait for the socket to accept connections
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if await daemon_request({"op": "status"}) is not None:
+                return {"status": "started", "pid": proc.pid, "socket": str(DAEMON_SOCKET)}
+            if proc.poll() is not None:
+                break
+            await asyncio.sleep(0.1)
+        raise RuntimeError(f"Daemon failed to start; see {DAEMON_LOG}")
+
+    raise ValueError(f"Unknown daemon action: {action}. Use start, stop, status or run")
+
+
 # =============================================================================
 # Commands
 # =============================================================================
@@ -247,51 +1402,363 @@ def cmd_servers(servers: dict) -> list[dict]:
     return result
 
 
-async def cmd_tools(servers: dict, server_name: str) -> list[dict]:
-    """List all tools from a server with full schemas."""
+def error_type(e: Exception) -> str:
+    """Map an exception to the error `type` reported in JSON output."""
+    if isinstance(e, ValueError):
+        return "validation"
+    if isinstance(e, ConnectionError):
+        return "connection"
+    return "error"
+
+
+def format_tools(result) -> list[dict]:
+    """Convert a list_tools() result into plain dicts."""
+    tools = []
+    for tool in result.tools:
+        tools.append({
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": tool.inputSchema,
+        })
+    return tools
+
+
+def format_content(items: list[dict]) -> Any:
+    """Collapse described content items into the classic `call` output."""
+    contents = []
+    for item in items:
+        if item["type"] in ("text", "other"):
+            contents.append(item["text"])
+        elif item["type"] == "data":
+            contents.append({"type": "data", "data": item["data"]})
+        else:
+            contents.append(item)
+    return contents[0] if len(contents) == 1 else contents
+
+
+def describe_result(result) -> dict:
+    """Normalize a call_tool() result into {content: [...], isError}."""
+    content = getattr(result, 'content', None)
+    if content is None:
+        return {"content": [{"type": "other", "text": str(result)}], "isError": False}
+    return {
+        "content": [describe_content(item) for item in content],
+        "isError": bool(getattr(result, 'isError', False)),
+    }
+
+
+def describe_content(item) -> dict:
+    """Normalize one call_tool() content item into a JSON-safe dict."""
+    if hasattr(item, 'text'):
+        return {"type": "text", "text": item.text}
+    if hasattr(item, 'data'):
+        return {"type": "data", "data": item.data, "mimeType": getattr(item, 'mimeType', None)}
+    if (resource := getattr(item, 'resource', None)) is not None:
+        entry = {"type": "resource", "uri": str(resource.uri), "mimeType": resource.mimeType}
+        if hasattr(resource, 'blob'):
+            entry["data"] = resource.blob
+        else:
+            entry["text"] = getattr(resource, 'text', "")
+        return entry
+    return {"type": "other", "text": str(item)}
+
+
+class SpillWriter:
+    """Replaces binary or oversized content items with references to files."""
+
+    def __init__(self, directory: Path = SPILL_DIR, threshold: int = DEFAULT_SPILL_THRESHOLD):
+        self.directory = directory
+        self.threshold = threshold
+        self._pruned = False
+
+    def _prune(self):
+        """Remove spill files older than SPILL_MAX_AGE from earlier runs."""
+        cutoff = time.time() - SPILL_MAX_AGE
+        for old in self.directory.glob("mcp-*"):
+            try:
+                if old.stat().st_mtime < cutoff:
+                    old.unlink()
+            except OSError:
+                pass
+        self._pruned = True
+
+    def process(self, item: dict) -> dict:
+        """Return the item unchanged, or a {path, bytes} reference if spilled."""
+        if "data" in item:
+            # Binary payloads arrive base64-encoded; store the decoded bytes
+            payload = base64.b64decode(item.pop("data"))
+            suffix = mimetypes.guess_extension(item.get("mimeType") or "") or ".bin"
+        elif len(item.get("text", "")) * 4 > self.threshold:
+            encoded = item["text"].encode("utf-8")
+            if len(encoded) <= self.threshold:
+                return item
+            payload = encoded
+            del item["text"]
+            suffix = ".txt"
+        else:
+            return item
+
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not self._pruned:
+            self._prune()
+        fd, path = tempfile.mkstemp(prefix="mcp-", suffix=suffix, dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        return {**item, "path": path, "bytes": len(payload)}
+
+
+async def cmd_tools(servers: dict, server_name: str, refresh: bool = False) -> list[dict]:
+    """List all tools from a server with full schemas.
+
+    Served from the schema cache when fresh; `refresh` forces a live fetch.
+    """
     config = get_server_config(servers, server_name)
 
-    async with create_session(config) as session:
-        result = await session.list_tools()
+    if not refresh:
+        cached = read_schema_cache(server_name, config)
+        if cached is not None:
+            return cached
+
+    reply = await forward_to_daemon({"op": "tools", "server": server_name, "config": config})
+    if reply is not None:
+        tools = unwrap_daemon_reply(reply)
+    else:
+        async with create_session(config, server_name) as session:
+            with timed(server_name, detect_transport(config), "list_tools"):
+                tools = format_tools(await session.list_tools())
+
+    write_schema_cache(server_name, config, tools)
+    update_tool_index(server_name, config, tools)
+    return tools
 
-        tools = []
-        for tool in result.tools:
-            tools.append({
-                "name": tool.name,
-                "description": tool.description,
-                "parameters": tool.inputSchema,
-            })
-        return tools
 
+async def cmd_tools_all(servers: dict, refresh: bool = False, timeout: float = 30) -> dict:
+    """List tools from every configured server in parallel.
 
-async def cmd_call(servers: dict, server_name: str, tool_name: str, arguments: dict) -> Any:
-    """Execute a tool on a server."""
+    Each server gets its own deadline (its config `timeout`, else `timeout`),
+    so a slow server is reported as timed out without holding up the rest.
+    """
+    async def list_one(server_name: str) -> tuple[str, dict]:
+        deadline = float(servers[server_name].get("timeout", timeout))
+        try:
+            tools = await asyncio.wait_for(cmd_tools(servers, server_name, refresh), deadline)
+            return server_name, {"status": "ok", "tools": tools}
+        except asyncio.TimeoutError:
+            return server_name, {"status": "timeout", "error": f"No response within {deadline:g}s"}
+        except Exception as e:
+            return server_name, {"status": "error", "error": str(e), "type": error_type(e)}
+
+    results = await asyncio.gather(*(list_one(name) for name in servers))
+    return {
+        "servers": dict(results),
+        "failed": [name for name, entry in results if entry["status"] != "ok"],
+        "tool_count": sum(len(entry.get("tools", [])) for _, entry in results),
+    }
+
+
+async def cmd_find(servers: dict, query: str, limit: int = 5, refresh: bool = False) -> dict:
+    """Search tools across all servers from the local index.
+
+    No server is contacted unless `refresh` is set, in which case every
+    server is listed first (schema cache permitting) to fill the index.
+    """
+    if refresh:
+        await cmd_tools_all(servers)
+    index = sync_tool_index(servers)
+
+    indexed = {
+        name for name, entry in index["servers"].items()
+        if name in servers and entry.get("config_hash") == config_hash(servers[name])
+    }
+    return {
+        "query": query,
+        "results": search_tool_index(index, servers, query, limit),
+        "unindexed": [name for name in servers if name not in indexed],
+    }
+
+
+async def call_once(
+    config: dict, server_name: str, tool_name: str, arguments: dict, direct: bool = False
+) -> dict:
+    """One call through the daemon if running (and not `direct`), else a direct session."""
+    if not direct:
+        reply = await forward_to_daemon({
+            "op": "call",
+            "server": server_name,
+            "config": config,
+            "tool": tool_name,
+            "arguments": arguments,
+        })
+        if reply is not None:
+            return unwrap_daemon_reply(reply)
+
+    async with create_session(config, server_name) as session:
+        with timed(server_name, detect_transport(config), "call_tool"):
+            return describe_result(await session.call_tool(tool_name, arguments))
+
+
+async def cmd_call(
+    servers: dict, server_name: str, tool_name: str, arguments: dict, use_cache: bool = True
+) -> Any:
+    """Execute a tool on a server.
+
+    Tools listed in the server's `cache` block are answered from the result
+    cache when possible, without opening a session. Tools listed under
+    `hedge` are retried/hedged per hedge_policy().
+    """
     config = get_server_config(servers, server_name)
 
-    async with create_session(config) as session:
-        result = await session.call_tool(tool_name, arguments)
-
-        # Extract content from result
-        if hasattr(result, 'content'):
-            contents = []
-            for item in result.content:
-                if hasattr(item, 'text'):
-                    contents.append(item.text)
-                elif hasattr(item, 'data'):
-                    contents.append({"type": "data", "data": item.data})
-                else:
-                    contents.append(str(item))
-            return contents[0] if len(contents) == 1 else contents
-        return result
+    ttl = result_cache_ttl(config, tool_name) if use_cache else 0
+    if ttl:
+        hit, cached = read_result_cache(server_name, tool_name, arguments)
+        if hit:
+            return cached
+
+    attempts = 0
+
+    async def attempt() -> dict:
+        # Hedged attempts connect directly: through the daemon they would
+        # queue behind the slow first attempt for the server's warm session
+        nonlocal attempts
+        attempts += 1
+        return await call_once(config, server_name, tool_name, arguments, direct=attempts > 1)
+
+    if policy := hedge_policy(config, tool_name):
+        described = await hedged(attempt, *policy)
+    else:
+        described = await attempt()
+
+    output = format_content(described["content"])
+    if ttl and not described["isError"]:
+        write_result_cache(server_name, tool_name, arguments, output, ttl)
+    return output
+
+
+async def cmd_call_stream(
+    servers: dict, server_name: str, tool_name: str, arguments: dict, spill: SpillWriter
+) -> None:
+    """Execute a tool, writing each content item to stdout as a JSONL line.
+
+    Binary and oversized items go to spill files and are emitted as
+    references. A final {"type": "end"} line reports the item count and
+    whether the tool flagged an error.
+    """
+    config = get_server_config(servers, server_name)
+
+    def emit(items, is_error: bool):
+        count = 0
+        for index, item in enumerate(items):
+            print(json.dumps({"index": index, **spill.process(item)}, default=str), flush=True)
+            count += 1
+        print(json.dumps({"type": "end", "items": count, "isError": bool(is_error)}), flush=True)
+
+    reply = await forward_to_daemon({
+        "op": "call",
+        "server": server_name,
+        "config": config,
+        "tool": tool_name,
+        "arguments": arguments,
+    })
+    if reply is not None:
+        result = unwrap_daemon_reply(reply)
+        emit(result["content"], result["isError"])
+        return
+
+    async with create_session(config, server_name) as session:
+        with timed(server_name, detect_transport(config), "call_tool"):
+            result = await session.call_tool(tool_name, arguments)
+        content = getattr(result, 'content', None)
+        if content is None:
+            emit([{"type": "other", "text": str(result)}], False)
+        else:
+            emit((describe_content(item) for item in content), getattr(result, 'isError', False))
+
+
+async def cmd_batch(servers: dict, source: str = "-", concurrency: int = 8, per_server: int = 4) -> None:
+    """Run a JSONL stream of {server, tool, arguments} records concurrently.
+
+    Records run under a global and a per-server concurrency limit, calls to
+    the same server share one session, and each result is written to stdout
+    as a JSONL line tagged with its input index as soon as it completes.
+    """
+    stream = sys.stdin if source == "-" else open(source)
+    loop = asyncio.get_running_loop()
+
+    global_limit = asyncio.Semaphore(max(1, concurrency))
+    server_limits: dict[str, asyncio.Semaphore] = {}
+    sessions: dict[str, asyncio.Future] = {}
+
+    async def session_for(server_name: str):
+        # Opened once on first use; concurrent callers await the same future
+        if server_name not in sessions:
+            config = get_server_config(servers, server_name)
+            sessions[server_name] = asyncio.ensure_future(WarmSession(config, server_name).start())
+        return (await sessions[server_name]).session
+
+    def emit(record: dict):
+        print(json.dumps(record, default=str), flush=True)
+
+    async def run(index: int, line: str):
+        out: dict = {"index": index}
+        try:
+            record = json.loads(line)
+            server_name, tool_name = record["server"], record["tool"]
+            out.update(server=server_name, tool=tool_name)
+            arguments = record.get("arguments") or {}
+            config = get_server_config(servers, server_name)
+
+            ttl = result_cache_ttl(config, tool_name)
+            hit, cached = read_result_cache(server_name, tool_name, arguments) if ttl else (False, None)
+            if hit:
+                out["result"] = cached
+            else:
+                limit = server_limits.setdefault(server_name, asyncio.Semaphore(max(1, per_server)))
+                async with limit, global_limit:
+                    session = await session_for(server_name)
+                    with timed(server_name, detect_transport(config), "call_tool"):
+                        described = describe_result(await session.call_tool(tool_name, arguments))
+                out["result"] = format_content(described["content"])
+                if ttl and not described["isError"]:
+                    write_result_cache(server_name, tool_name, arguments, out["result"], ttl)
+        except KeyError as e:
+            out.update(error=f"Record missing field {e}", type="validation")
+        except Exception as e:
+            out.update(error=str(e), type=error_type(e))
+        emit(out)
+
+    # Read lazily so calls start while input is still arriving, but cap the
+    # number of records held in memory
+    max_pending = max(1, concurrency) * 4
+    pending: set[asyncio.Task] = set()
+    index = 0
+    try:
+        while line := await loop.run_in_executor(None, stream.readline):
+            if not line.strip():
+                continue
+            if len(pending) >= max_pending:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.add(asyncio.create_task(run(index, line)))
+            index += 1
+        if pending:
+            await asyncio.wait(pending)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        for future in sessions.values():
+            if future.done() and not future.exception():
+                await future.result().close()
 
 
 # =============================================================================
 # CLI Interface
 # =============================================================================
 
-def print_json(data: Any) -> None:
-    """Print data as formatted JSON."""
-    print(json.dumps(data, indent=2, default=str))
+def print_json(data: Any, compact: bool = False) -> None:
+    """Print data as formatted JSON (single-line when compact)."""
+    if compact:
+        print(json.dumps(data, separators=(",", ":"), default=str))
+    else:
+        print(json.dumps(data, indent=2, default=str))
 
 
 def print_error(message: str, error_type: str = "error") -> None:
@@ -299,19 +1766,61 @@ def print_error(message: str, error_type: str = "error") -> None:
     print(json.dumps({"error": message, "type": error_type}))
 
 
+def parse_options(argv: list[str], valued: tuple[str, ...] = ()) -> tuple[list[str], dict]:
+    """Split CLI args into positionals and --options.
+
+    Options named in `valued` consume the following argument; any other
+    --option is a boolean flag.
+    """
+    positional, options = [], {}
+    args = iter(argv)
+    for arg in args:
+        if arg.startswith("--") and len(arg) > 2:
+            name = arg[2:]
+            if name in valued:
+                value = next(args, None)
+                if value is None:
+                    raise ValueError(f"Option --{name} requires a value")
+                options[name] = value
+            else:
+                options[name] = True
+        else:
+            positional.append(arg)
+    return positional, options
+
+
 def print_usage():
     """Print usage information."""
     usage = """Usage: mcp_client.py <command> [args]
 
 Commands:
     servers                           List configured MCP servers
-    tools <server>                    List tools with full schemas
+    tools <server> [--refresh]        List tools with full schemas (cached)
+    tools --all [--timeout <s>]       List tools from every server in parallel
     call <server> <tool> '<json>'     Execute a tool with arguments
+        --no-cache                    Skip the result cache for allowlisted tools
+        --stream                      Emit content items as JSONL, spilling large/binary ones
+        --spill-dir <dir>             Where spilled payloads go (default $MCP_CLIENT_HOME/spill)
+        --spill-threshold <bytes>     Spill text items larger than this (default 65536)
+    find <query> [--limit <n>]        Search indexed tools across servers (offline)
+        --refresh                     List every server first to fill the index
+    batch [file|-]                    Run JSONL {server, tool, arguments} records
+        --concurrency <n>             Calls in flight overall (default 8)
+        --per-server <n>              Calls in flight per server (default 4)
+    stats [server] [--since <s>]      p50/p95/p99 latency per server and phase
+    daemon start|stop|status|run      Manage the warm-session daemon
+        --idle-timeout <seconds>      Close sessions idle this long (default 300)
+        --max-sessions <n>            Sessions kept per server (default 1)
 
 Examples:
     python mcp_client.py servers
     python mcp_client.py tools github
     python mcp_client.py call github search_repos '{"query": "python mcp"}'
+    python mcp_client.py batch calls.jsonl --concurrency 10
+    python mcp_client.py daemon start
+
+Global options:
+    --compact                         Print single-line JSON instead of indented
 
 Config sources (checked in order):
     1. MCP_CONFIG_PATH environment variable
@@ -332,6 +1841,31 @@ async def main():
         print_usage()
         sys.exit(0)
 
+    try:
+        argv, options = parse_options(sys.argv, valued=(
+            "idle-timeout", "max-sessions", "concurrency", "per-server", "timeout",
+            "spill-dir", "spill-threshold", "since", "limit",
+        ))
+    except ValueError as e:
+        print_error(str(e), "usage")
+        sys.exit(1)
+    compact = bool(options.get("compact"))
+
+    # The daemon receives server configs per request, so it needs no config
+    if command == "daemon":
+        if len(argv) < 3:
+            print_error("Usage: daemon start|stop|status|run", "usage")
+            sys.exit(1)
+        try:
+            print_json(await cmd_daemon(argv[2].lower(), options), compact)
+        except ValueError as e:
+            print_error(str(e), "usage")
+            sys.exit(1)
+        except Exception as e:
+            print_error(f"Error: {e}", "error")
+            sys.exit(1)
+        return
+
     # Load config
     try:
         servers = load_config()
@@ -342,31 +1876,73 @@ async def main():
     try:
         if command == "servers":
             result = cmd_servers(servers)
-            print_json(result)
+            print_json(result, compact)
 
         elif command == "tools":
-            if len(sys.argv) < 3:
-                print_error("Usage: tools <server_name>", "usage")
+            if options.get("all"):
+                result = await cmd_tools_all(
+                    servers,
+                    refresh=bool(options.get("refresh")),
+                    timeout=float(options.get("timeout", 30)),
+                )
+                print_json(result, compact)
+                return
+            if len(argv) < 3:
+                print_error("Usage: tools <server_name> | tools --all", "usage")
                 sys.exit(1)
-            server_name = sys.argv[2]
-            result = await cmd_tools(servers, server_name)
-            print_json(result)
+            server_name = argv[2]
+            result = await cmd_tools(servers, server_name, refresh=bool(options.get("refresh")))
+            print_json(result, compact)
 
         elif command == "call":
-            if len(sys.argv) < 4:
+            if len(argv) < 4:
                 print_error("Usage: call <server> <tool> [json_args]", "usage")
                 sys.exit(1)
-            server_name = sys.argv[2]
-            tool_name = sys.argv[3]
+            server_name = argv[2]
+            tool_name = argv[3]
             args = {}
-            if len(sys.argv) >= 5:
+            if len(argv) >= 5:
                 try:
-                    args = json.loads(sys.argv[4])
+                    args = json.loads(argv[4])
                 except json.JSONDecodeError as e:
                     print_error(f"Invalid JSON arguments: {e}", "invalid_args")
                     sys.exit(1)
-            result = await cmd_call(servers, server_name, tool_name, args)
-            print_json(result)
+            if options.get("stream"):
+                spill = SpillWriter(
+                    Path(options.get("spill-dir", SPILL_DIR)).expanduser(),
+                    int(options.get("spill-threshold", DEFAULT_SPILL_THRESHOLD)),
+                )
+                await cmd_call_stream(servers, server_name, tool_name, args, spill)
+                return
+            result = await cmd_call(
+                servers, server_name, tool_name, args, use_cache=not options.get("no-cache")
+            )
+            print_json(result, compact)
+
+        elif command == "find":
+            if len(argv) < 3:
+                print_error("Usage: find <query>", "usage")
+                sys.exit(1)
+            result = await cmd_find(
+                servers,
+                " ".join(argv[2:]),
+                limit=int(options.get("limit", 5)),
+                refresh=bool(options.get("refresh")),
+            )
+            print_json(result, compact)
+
+        elif command == "stats":
+            since = float(options["since"]) if "since" in options else None
+            print_json(cmd_stats(argv[2] if len(argv) >= 3 else None, since), compact)
+
+        elif command == "batch":
+            source = argv[2] if len(argv) >= 3 else "-"
+            await cmd_batch(
+                servers,
+                source,
+                concurrency=int(options.get("concurrency", 8)),
+                per_server=int(options.get("per-server", 4)),
+            )
 
         else:
             print_error(f"Unknown command: {command}", "usage")
@@ -382,6 +1958,8 @@ async def main():
     except Exception as e:
         print_error(f"Error: {e}", "error")
         sys.exit(1)
+    finally:
+        await close_http_pools()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Stub MCP Server - A local stand-in server for benchmarking mcp_client.py.
+
+Exposes a few deterministic tools with no external dependencies, so
+transport overhead can be measured without network or API noise.
+
+Tools:
+- echo: Return the given text
+- blob: Return a string of `size` bytes (large payload tests)
+- image: Return a binary image content item of `size` bytes
+
+Usage:
+    python stub_server.py                                  # stdio
+    python stub_server.py --transport sse --port 8765      # http://127.0.0.1:8765/sse
+    python stub_server.py --transport streamable-http --port 8766   # http://127.0.0.1:8766/mcp
+"""
+
+import argparse
+
+from mcp.server.fastmcp import FastMCP, Image
+
+
+def build_server(host: str = "127.0.0.1", port: int = 8765) -> FastMCP:
+    """Create the stub server with its tools registered."""
+    server = FastMCP("stub", host=host, port=port, log_level="WARNING")
+
+    @server.tool()
+    def echo(text: str) -> str:
+        """Return the given text unchanged."""
+        return text
+
+    @server.tool()
+    def blob(size: int) -> str:
+        """Return a text payload of `size` bytes."""
+        return "x" * size
+
+    @server.tool()
+    def image(size: int) -> Image:
+        """Return a PNG-typed binary payload of `size` bytes."""
+        return Image(data=b"\x89PNG" + b"\0" * max(0, size - 4), format="png")
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub MCP server for benchmarks")
+    parser.add_argument("--transport", default="stdio", choices=["stdio", "sse", "streamable-http"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    build_server(args.host, args.port).run(transport=args.transport)
+
+
+if __name__ == "__main__":
+    main()